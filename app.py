@@ -1,29 +1,81 @@
-import json
+import asyncio
 import os
+import threading
+import time
 from datetime import datetime
 
-import requests
 from bson import ObjectId
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
-from google import genai
 from pydantic import BaseModel
-from pymongo import MongoClient
+
+from clients import (
+    LazyProxy,
+    ProcessLocal,
+    get_gemini_client,
+    lazy_collection,
+    pool_status,
+)
+from company_query import CompaniesRequest, serialize_company
+from company_stats import (
+    COMPANY_STATS_ID,
+    STATS_MISSING,
+    facets_body,
+    parse_k,
+    stats_projection,
+    top_body,
+)
+from enrichment import enrich_all
+from entity_index import EntityIndex
+from founder_extraction import aextract_founders
+from gemini import GEMINI_MODEL, acall_gemini
+from indexes import ensure_indexes, explain_companies_query
+from jobs import JobQueue
+from linkd import get_linkd_client
+from llm_cache import LLMCache, cache_key
+from metrics import (
+    HTTP_REQUEST_SECONDS,
+    get_logger,
+    registry,
+    timed_cursor,
+    track_query,
+)
+from prompts import build_fill_prompt, compact_record
+from record_io import merge_records, read_records
+from response_cache import CollectionPayloadCache, payload_response
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+log = get_logger("app")
+
+# MongoDB collections, resolved through a client created on first use in
+# each process so gunicorn workers never share one (see clients.py)
+companies_collection = lazy_collection("startups")
+ucla_startups_collection = lazy_collection("ucla_startups")
+# Version markers bumped by writers of cached collections
+versions_collection = lazy_collection("collection_versions")
+ucla_jobs_collection = lazy_collection("ucla_jobs")
+# Materialized facets and leaderboard, refreshed by score normalization
+stats_collection = lazy_collection("company_stats")
+
+
+def bootstrap_indexes():
+    try:
+        ensure_indexes(companies_collection)
+        ucla_jobs.ensure_indexes()
+    except Exception as e:
+        log.error("index_bootstrap_failed", error=str(e))
 
-# MongoDB connection
-client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
-db = client["startup_database"]
-companies_collection = db["startups"]
-ucla_startups_collection = db["ucla_startups"]
-API_KEY = os.getenv("GEMINI_API_KEY")
-client = genai.Client(api_key=API_KEY)
+
+gemini_client = LazyProxy(get_gemini_client)
+# Founder records extracted from Linkd, .ndjson/.jsonl (optionally .gz) to stream
+FOUNDER_DATA_PATH = os.getenv("FOUNDER_DATA_PATH", "founder_data.json")
+llm_cache = LLMCache()
+entity_index = EntityIndex()
 
 
 class StartUp(BaseModel):
@@ -40,23 +92,26 @@ class StartUp(BaseModel):
     stage: str = ""
 
 
-async def fill_startup_data(startup_data):
-
-    prompt = f"""
-    Fill the following startup data:
-    {startup_data}
+async def fill_startup_data(startup_data, refresh=False):
     """
-    response = client.models.generate_content(
-        model="gemini-2.5-flash-preview-04-17",
-        contents=prompt,
-        config={
-            "response_mime_type": "application/json",
-            "response_schema": StartUp,
-        },
-    )
-
-    response_data = json.loads(response.text)
-    print(response_data, "response_data")
+    Fills the missing fields of a startup record with Gemini. refresh asks
+    Gemini even when the answer is cached, then caches the new answer.
+    """
+    prompt = build_fill_prompt(startup_data)
+    # Records whose prompt fields are unchanged are answered from the cache
+    # without calling Gemini, keyed like the prompt: ids, LinkedIn URLs and
+    # text past the field budgets do not change the answer
+    cache_key_ = cache_key(GEMINI_MODEL, StartUp, compact_record(startup_data))
+    response_data = None if refresh else llm_cache.get(cache_key_)
+    if response_data is None:
+        response_data = await acall_gemini(
+            gemini_client,
+            "fill_startup_data",
+            prompt,
+            StartUp,
+            record_id=startup_data.get("_id"),
+        )
+        llm_cache.set(cache_key_, response_data)
     # Merge startup_data with response_data
     # Start with the original startup_data
     complete_startup_data = (
@@ -77,195 +132,357 @@ async def fill_startup_data(startup_data):
     if "stage" not in complete_startup_data:
         complete_startup_data["stage"] = response_data.get("stage", "")
 
-    print("Complete startup data:", complete_startup_data)
+    log.debug("startup_filled", record=complete_startup_data)
     return complete_startup_data
 
 
-async def get_UCLA_alumnis(
-    query: str,
-):
-    url = "https://search.linkd.inc/api/search/users"
-    token = os.getenv("LINKD_API_KEY")
-    headers = {"Authorization": f"Bearer {token}"}
-
-    # Base parameters
-    params = {"query": query, "school": ["UCLA"]}
-
-    # Add any additional parameters
-
-    response = requests.request("GET", url, headers=headers, params=params)
-
-    data = response.json()
-
-    results = data["results"]
-
-    for result in results:
-
-        # Process each result to extract founder information
-        founder_data = []
-        for result in results:
-            # Check if the person has founder experience
-            is_founder = False
-            founder_experience = None
-
-            if "experience" in result:
-                for exp in result["experience"]:
-                    if "title" in exp and (
-                        "Founder" in exp["title"] or "Co-Founder" in exp["title"]
-                    ):
-                        is_founder = True
-                        founder_experience = exp
-                        break
-
-            if is_founder and founder_experience:
-                # Create a startup-like entry for this founder
-                startup_data = {
-                    "_id": str(result["profile"].get("id", "")),
-                    "Name": founder_experience.get("company_name", "Unknown Company"),
-                    "Description": result["profile"].get("headline", ""),
-                    "Founders": result["profile"].get("name", ""),
-                    "Founder_LinkedIn": {
-                        result["profile"]
-                        .get("name", ""): result["profile"]
-                        .get("linkedin_url", "")
-                    },
-                    "Launch Date": (
-                        founder_experience.get("start_date", "").split("T")[0]
-                        if founder_experience.get("start_date")
-                        else ""
-                    ),
-                    "Website": None,
-                    "Industry": [],
-                    "Early Metrics": "",
-                    "Funding Status": "",
-                    "Location": founder_experience.get(
-                        "location", result["profile"].get("location", "")
-                    ),
-                    "Press": "",
-                    "score": 0,
-                    "funding": 0,
-                    "stage": "",
-                }
-
-                founder_data.append(startup_data)
-    # Save founder data to a JSON file
-    for data in founder_data:
-        await fill_startup_data(data)
-
-    if founder_data:
+async def get_UCLA_alumnis(query: str, report=None):
+    """
+    Fetches UCLA alumni matching query from Linkd, extracts founders and
+    enriches them. report(**counters), when given, receives progress updates.
+    Returns the query and the number of profiles fetched.
+    """
+    report = report or (lambda **counters: None)
+    profiles = 0
+
+    async def counted(results):
+        nonlocal profiles
+        async for result in results:
+            profiles += 1
+            yield result
+
+    # Extract a startup record for every founder as the result pages of the
+    # shared, pooled Linkd client stream in, without keeping the profiles
+    records = [
+        record
+        async for record in aextract_founders(
+            counted(get_linkd_client().iter_profiles(query, school=("UCLA",)))
+        )
+    ]
+    data = {"total": profiles, "query": query}
+    report(profiles=profiles)
+
+    # Drop startups already ingested by earlier runs before paying for enrichment
+    founder_data, dedup_stats = entity_index.resolve(records)
+    log.info("entity_resolution", query=query, **dedup_stats)
+    report(
+        founders=len(founder_data),
+        duplicates=dedup_stats["llm_calls_avoided"],
+        enriched=0,
+    )
+
+    # Enrich all founders concurrently
+    enriched = await enrich_all(
+        founder_data,
+        fill_startup_data,
+        on_complete=lambda completed: report(enriched=completed),
+    )
+    # Write the access times of this run's cache hits off the event loop
+    await asyncio.to_thread(llm_cache.flush)
+
+    # Add the new startups to the founder data file, keeping the startups of
+    # earlier runs that entity resolution skipped
+    if enriched:
         try:
-            with open("founder_data.json", "w", encoding="utf-8") as f:
-                json.dump(founder_data, f, indent=2, ensure_ascii=False)
-            print(
-                f"Successfully saved {len(founder_data)} founder records to founder_data.json"
+            total = merge_records(FOUNDER_DATA_PATH, enriched)
+            log.info(
+                "founder_data_saved",
+                records=len(enriched),
+                total=total,
+                path=FOUNDER_DATA_PATH,
+            )
+            # Only saved and enriched startups count as ingested for later
+            # runs; enrich_all hands back the input record when it failed
+            entity_index.commit(
+                [
+                    record
+                    for record, result in zip(founder_data, enriched)
+                    if result is not record
+                ]
             )
         except Exception as e:
-            print(f"Error saving founder data to JSON: {str(e)}")
+            log.error("founder_data_save_failed", path=FOUNDER_DATA_PATH, error=str(e))
     else:
-        print("No founder data found to save")
+        log.info("founder_data_empty", query=query)
 
-    return response.json()
+    return data
 
 
 # Process founders data from JSON file
 async def process_founders():
     try:
-        # Check if the founder_data.json file exists
-        if not os.path.exists("founder_data.json"):
+        # Check if the founder data file exists
+        if not os.path.exists(FOUNDER_DATA_PATH):
             return jsonify({"error": "Founder data file not found"}), 404
 
-        # Read the founder data from the JSON file
-        with open("founder_data.json", "r", encoding="utf-8") as f:
-            founder_data = json.load(f)
+        # Read the founder data from the JSON or NDJSON file
+        founder_data = list(read_records(FOUNDER_DATA_PATH))
 
         if not founder_data:
             return jsonify({"message": "No founder data found in file"}), 200
 
-        # Process each founder entry
-        processed_count = 0
-        for data in founder_data:
-            # Fill missing fields for each startup entry
-            await fill_startup_data(data)
-            processed_count += 1
+        # Fill missing fields for every startup entry concurrently
+        processed = await enrich_all(founder_data, fill_startup_data)
+        await asyncio.to_thread(llm_cache.flush)
+        processed_count = len(processed)
 
         return jsonify(
             {
                 "success": True,
                 "message": f"Successfully processed {processed_count} founder records",
                 "processed_count": processed_count,
+                "cache": llm_cache.stats(),
             }
         )
     except Exception as e:
-        print(f"Error processing founder data: {str(e)}")
+        log.error("process_founders_failed", error=str(e))
         return jsonify({"error": str(e)}), 500
 
 
+def serialize_ucla_startups():
+    startups = timed_cursor(ucla_startups_collection.find(), "ucla_startups", "find")
+    return app.json.dumps([serialize_company(startup) for startup in startups]).encode()
+
+
+ucla_startups_cache = CollectionPayloadCache(
+    versions_collection,
+    "ucla_startups",
+    serialize_ucla_startups,
+    check_interval=float(os.getenv("UCLA_CACHE_CHECK_SECONDS", "5")),
+    max_age=float(os.getenv("UCLA_CACHE_MAX_AGE", "300")),
+)
+
+
 @app.route("/api/ucla-startups", methods=["GET"])
-async def get_ucla_startups():
+def get_ucla_startups():
     try:
-        # Fetch all UCLA startups from the collection
-        startups = list(ucla_startups_collection.find())
+        # Serve the cached payload, rebuilt only when ucla_startups changes
+        payload = ucla_startups_cache.get()
 
-        # Convert ObjectId to string for JSON serialization
-        for startup in startups:
-            startup["_id"] = str(startup["_id"])
-
-        return jsonify(startups)
+        return payload_response(request, Response(mimetype="application/json"), payload)
     except Exception as e:
-        print(f"Error fetching UCLA startups: {str(e)}")
+        log.error("ucla_startups_failed", error=str(e))
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/ucla", methods=["GET"])
-async def search():
-    print("search")
+def run_ucla_ingestion(params, report):
+    """
+    Job handler for /api/ucla/jobs: runs one Linkd fetch and enrichment pass.
+    """
+    data = asyncio.run(get_UCLA_alumnis(params["query"], report))
+    return {"query": params["query"], "profiles": data["total"]}
+
+
+ucla_jobs = JobQueue(ucla_jobs_collection, run_ucla_ingestion)
+
+
+def start_background_work():
+    # Create indexes in the background so startup does not wait on MongoDB
+    threading.Thread(target=bootstrap_indexes, daemon=True).start()
+    ucla_jobs.start()
+    return True
+
+
+# Threads do not survive a fork, so every process starts its own: gunicorn
+# workers from the post_worker_init hook, other servers on the first request
+background_work = ProcessLocal(start_background_work)
+
+
+@app.before_request
+def ensure_background_work():
+    background_work.get()
+
+
+@app.route("/api/ucla/jobs", methods=["POST"])
+def create_ucla_job():
+    """
+    Queues a UCLA ingestion run and returns its id without waiting for it.
+    """
     try:
-        # Get query parameter
-        # query = request.args.get("query", "")
-        query = "Founders"
-        print(query)
+        params = {
+            "query": (request.get_json(silent=True) or {}).get("query", "Founders")
+        }
+        job_id = ucla_jobs.enqueue(params)
+        response = jsonify({"job_id": job_id, "status": "queued"})
+        response.status_code = 202
+        response.headers["Location"] = f"/api/ucla/jobs/{job_id}"
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Execute query
-        results = await get_UCLA_alumnis(query)
-        return jsonify(results)
+
+@app.route("/api/ucla/jobs/<job_id>", methods=["GET"])
+def get_ucla_job(job_id):
+    """
+    Reports the status, progress counters and result of an ingestion run.
+    """
+    try:
+        job = ucla_jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        job["job_id"] = job.pop("_id")
+        return jsonify(job)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/ucla", methods=["GET"])
+def search():
+    """
+    Ingestion does not run inside requests: the run is queued as a job and
+    the response points at its status.
+    """
+    return create_ucla_job()
+
+
 @app.route("/api/companies", methods=["POST"])
 def get_companies():
+    """
+    Returns the companies matching the filters in the request body.
+
+    Optional paging parameters, in the body or the query string:
+        limit: page size, the response becomes {"companies": [...], "next_cursor": ...}
+        cursor: next_cursor value from the previous page
+        fields: list or comma separated string of fields to return
+        sort: "score" or "funding", with order "desc" (default) or "asc"
+        format: "ndjson" streams one company per line
+    """
     try:
-        # Get filter parameters from request body
-        filters = request.json
+        # Get filter parameters from request body and build MongoDB query
+        try:
+            companies_request = CompaniesRequest(request.json, request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        # Build MongoDB query
-        query = {}
+        # Execute query
+        log.debug("companies_query", query=companies_request.query)
+        companies = companies_collection.find(
+            companies_request.query, companies_request.projection
+        ).sort(companies_request.sort)
+
+        next_cursor = None
+        if companies_request.limit is not None:
+            # Fetch one extra document to know whether another page exists
+            with track_query("startups", "companies_page"):
+                documents = list(companies.limit(companies_request.limit + 1))
+            companies, next_cursor = companies_request.page(documents)
+        else:
+            companies = (
+                serialize_company(company)
+                for company in timed_cursor(companies, "startups", "companies_stream")
+            )
 
-        if "industry" in filters:
-            query["Industry"] = {"$in": filters["industry"]}
+        if companies_request.format == "ndjson":
+            response = Response(
+                (app.json.dumps(company) + "\n" for company in companies),
+                mimetype="application/x-ndjson",
+            )
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return response
 
-        if "location" in filters:
-            query["Location"] = filters["location"]
+        if companies_request.limit is not None:
+            return jsonify({"companies": companies, "next_cursor": next_cursor})
 
-        if "funding" in filters:
-            query["funding"] = {"$gte": filters["funding"]}
+        # Stream the full result as a JSON array without holding it in memory
+        def stream_array():
+            yield "["
+            for index, company in enumerate(companies):
+                yield ("," if index else "") + app.json.dumps(company)
+            yield "]"
 
-        if "stage" in filters:
-            query["stage"] = filters["stage"]
+        return Response(stream_array(), mimetype="application/json")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Execute query
-        print(query)
-        companies = list(companies_collection.find(query))
 
-        # Convert ObjectId to string for JSON serialization
-        for company in companies:
-            company["_id"] = str(company["_id"])
+@app.route("/api/companies/facets", methods=["GET"])
+def get_company_facets():
+    """
+    Returns industry, stage and location counts over all companies, each
+    facet a list of {"value", "count"} entries, most common first.
+    """
+    try:
+        with track_query("company_stats", "facets"):
+            stats = stats_collection.find_one(
+                {"_id": COMPANY_STATS_ID}, stats_projection()
+            )
+        if stats is None:
+            return jsonify(STATS_MISSING), 404
+        return jsonify(facets_body(stats))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/companies/top", methods=["GET"])
+def get_top_companies():
+    """
+    Returns the k best scored companies, k from 1 to TOP_K_MAX (default 10).
+    """
+    try:
+        try:
+            k = parse_k(request.args.get("k", 10))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Only the first k leaderboard entries leave the database
+        with track_query("company_stats", "top"):
+            stats = stats_collection.find_one(
+                {"_id": COMPANY_STATS_ID}, stats_projection(k)
+            )
+        if stats is None:
+            return jsonify(STATS_MISSING), 404
+        return jsonify(top_body(stats))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
-        return jsonify(companies)
+@app.route("/api/companies/explain", methods=["POST"])
+def explain_companies():
+    """
+    Reports the winning plan /api/companies would use for the same request body.
+    """
+    try:
+        return jsonify(
+            explain_companies_query(companies_collection, request.json or {})
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_time(response):
+    if request.url_rule is not None and request.url_rule.rule != "/metrics":
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_start,
+            method=request.method,
+            endpoint=request.url_rule.rule,
+            status=response.status_code,
+        )
+    return response
+
+
+@app.route("/ready")
+def ready():
+    """
+    Readiness of this worker process: MongoDB ping and connection pool counters.
+    """
+    status = pool_status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+@app.route("/metrics")
+def metrics():
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
 # default route
 @app.route("/")
 def index():
@@ -273,4 +490,5 @@ def index():
 
 
 if __name__ == "__main__":
+    background_work.get()
     app.run(debug=False)
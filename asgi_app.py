@@ -0,0 +1,274 @@
+"""
+ASGI serving mode: the read and job routes of app.py on Quart, backed by one
+Motor (async MongoDB) client shared by all requests. Linkd and Gemini are
+only called by the job workers, never on the request path.
+
+Run with:
+    uvicorn asgi_app:app --workers 4
+
+Ingestion jobs queued here are executed by the job workers of app.py or
+worker.py, which share the ucla_jobs collection.
+"""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from quart import Quart, Response, g, jsonify, request
+from quart_cors import cors
+
+from company_query import CompaniesRequest, serialize_company
+from company_stats import (
+    COMPANY_STATS_ID,
+    STATS_MISSING,
+    facets_body,
+    parse_k,
+    stats_projection,
+    top_body,
+)
+from indexes import explain_command, summarize_explanation
+from jobs import new_job
+from metrics import HTTP_REQUEST_SECONDS, get_logger, registry, track_query
+from response_cache import AsyncCollectionPayloadCache, payload_response
+
+# Load environment variables
+load_dotenv()
+
+app = cors(Quart(__name__))
+log = get_logger("asgi_app")
+
+MONGO_POOL_SIZE = int(os.getenv("MONGO_POOL_SIZE", "100"))
+
+
+@app.before_serving
+async def open_clients():
+    # Clients are created on the serving event loop and shared by all requests
+    app.mongo_client = AsyncIOMotorClient(
+        os.getenv("MONGODB_URI", "mongodb://localhost:27017/"),
+        maxPoolSize=MONGO_POOL_SIZE,
+    )
+    db = app.mongo_client["startup_database"]
+    app.companies_collection = db["startups"]
+    app.ucla_startups_collection = db["ucla_startups"]
+    app.ucla_jobs_collection = db["ucla_jobs"]
+    app.stats_collection = db["company_stats"]
+    app.ucla_startups_cache = AsyncCollectionPayloadCache(
+        db["collection_versions"],
+        "ucla_startups",
+        serialize_ucla_startups,
+        check_interval=float(os.getenv("UCLA_CACHE_CHECK_SECONDS", "5")),
+        max_age=float(os.getenv("UCLA_CACHE_MAX_AGE", "300")),
+    )
+
+
+@app.after_serving
+async def close_clients():
+    app.mongo_client.close()
+
+
+async def serialize_ucla_startups():
+    startups = [
+        serialize_company(startup)
+        async for startup in app.ucla_startups_collection.find()
+    ]
+    return app.json.dumps(startups).encode()
+
+
+@app.route("/api/ucla-startups", methods=["GET"])
+async def get_ucla_startups():
+    try:
+        # Serve the cached payload, rebuilt only when ucla_startups changes
+        payload = await app.ucla_startups_cache.get()
+
+        return payload_response(
+            request, Response(b"", mimetype="application/json"), payload
+        )
+    except Exception as e:
+        log.error("ucla_startups_failed", error=str(e))
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/ucla/jobs", methods=["POST"])
+async def create_ucla_job():
+    """
+    Queues a UCLA ingestion run and returns its id without waiting for it.
+    """
+    try:
+        body = await request.get_json(silent=True) or {}
+        job = new_job({"query": body.get("query", "Founders")})
+        await app.ucla_jobs_collection.insert_one(job)
+        response = jsonify({"job_id": job["_id"], "status": "queued"})
+        response.status_code = 202
+        response.headers["Location"] = f"/api/ucla/jobs/{job['_id']}"
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/ucla/jobs/<job_id>", methods=["GET"])
+async def get_ucla_job(job_id):
+    """
+    Reports the status, progress counters and result of an ingestion run.
+    """
+    try:
+        job = await app.ucla_jobs_collection.find_one({"_id": job_id})
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        job["job_id"] = job.pop("_id")
+        return jsonify(job)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/ucla", methods=["GET"])
+async def search():
+    """
+    Ingestion does not run inside ASGI requests: the run is queued as a job
+    and the response points at its status.
+    """
+    return await create_ucla_job()
+
+
+@app.route("/api/companies", methods=["POST"])
+async def get_companies():
+    """
+    Returns the companies matching the filters in the request body, with the
+    same paging parameters as app.get_companies.
+    """
+    try:
+        # Get filter parameters from request body and build MongoDB query
+        try:
+            companies_request = CompaniesRequest(
+                await request.get_json(silent=True), request.args
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Execute query
+        companies = app.companies_collection.find(
+            companies_request.query, companies_request.projection
+        ).sort(companies_request.sort)
+
+        next_cursor = None
+        if companies_request.limit is not None:
+            # Fetch one extra document to know whether another page exists
+            with track_query("startups", "companies_page"):
+                documents = await companies.limit(companies_request.limit + 1).to_list(
+                    None
+                )
+            companies, next_cursor = companies_request.page(documents)
+
+        async def stream_companies(separator, prefix="", suffix=""):
+            yield prefix
+            index = 0
+            if isinstance(companies, list):
+                for company in companies:
+                    yield (separator if index else "") + app.json.dumps(company)
+                    index += 1
+            else:
+                async for company in companies:
+                    company = serialize_company(company)
+                    yield (separator if index else "") + app.json.dumps(company)
+                    index += 1
+            yield suffix
+
+        if companies_request.format == "ndjson":
+            response = Response(
+                stream_companies("\n", suffix="\n"), mimetype="application/x-ndjson"
+            )
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return response
+
+        if companies_request.limit is not None:
+            return jsonify({"companies": companies, "next_cursor": next_cursor})
+
+        # Stream the full result as a JSON array without holding it in memory
+        return Response(stream_companies(",", "[", "]"), mimetype="application/json")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/companies/facets", methods=["GET"])
+async def get_company_facets():
+    """
+    Returns industry, stage and location counts over all companies, each
+    facet a list of {"value", "count"} entries, most common first.
+    """
+    try:
+        stats = await app.stats_collection.find_one(
+            {"_id": COMPANY_STATS_ID}, stats_projection()
+        )
+        if stats is None:
+            return jsonify(STATS_MISSING), 404
+        return jsonify(facets_body(stats))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/companies/top", methods=["GET"])
+async def get_top_companies():
+    """
+    Returns the k best scored companies, k from 1 to TOP_K_MAX (default 10).
+    """
+    try:
+        try:
+            k = parse_k(request.args.get("k", 10))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Only the first k leaderboard entries leave the database
+        stats = await app.stats_collection.find_one(
+            {"_id": COMPANY_STATS_ID}, stats_projection(k)
+        )
+        if stats is None:
+            return jsonify(STATS_MISSING), 404
+        return jsonify(top_body(stats))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/companies/explain", methods=["POST"])
+async def explain_companies():
+    """
+    Reports the winning plan /api/companies would use for the same request body.
+    """
+    try:
+        command, query = explain_command(
+            app.companies_collection.name, await request.get_json(silent=True) or {}
+        )
+        explanation = await app.companies_collection.database.command(command)
+        return jsonify(summarize_explanation(explanation, query))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.before_request
+async def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+async def record_request_time(response):
+    if request.url_rule is not None and request.url_rule.rule != "/metrics":
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_start,
+            method=request.method,
+            endpoint=request.url_rule.rule,
+            status=response.status_code,
+        )
+    return response
+
+
+@app.route("/metrics")
+async def metrics():
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+# default route
+@app.route("/")
+async def index():
+    return "Hello, World!"
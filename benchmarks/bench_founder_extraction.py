@@ -0,0 +1,67 @@
+"""
+Benchmark of founder extraction over sample_data/linkd_results.json scaled
+up to n profiles: the previous nested loop against the single-pass
+founder_extraction.extract_founders generator.
+
+Usage:
+    python benchmarks/bench_founder_extraction.py [n]
+"""
+
+import copy
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+from founder_extraction import extract_founders, founder_record  # noqa: E402
+
+
+def scaled_profiles(n):
+    with open(os.path.join(ROOT, "sample_data", "linkd_results.json")) as f:
+        base = json.load(f)["results"]
+    profiles = []
+    for i in range(n):
+        profile = copy.deepcopy(base[i % len(base)])
+        profile["profile"]["id"] = i
+        profiles.append(profile)
+    return profiles
+
+
+def legacy_extract(results):
+    # The outer loop re-ran the whole extraction once per result
+    for _ in results:
+        founder_data = [
+            record
+            for record in (founder_record(result) for result in results)
+            if record is not None
+        ]
+    return founder_data
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    output = func(*args)
+    return time.perf_counter() - start, output
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    profiles = scaled_profiles(n)
+
+    elapsed, founders = timed(lambda p: list(extract_founders(p)), profiles)
+    print(
+        f"streaming: {n:>7} profiles -> {len(founders)} founders in {elapsed:.3f}s "
+        f"({n / elapsed:,.0f} profiles/s)"
+    )
+
+    # The legacy loop is quadratic, time it on a sample and extrapolate
+    sample_size = min(n, 2_000)
+    elapsed, _ = timed(legacy_extract, profiles[:sample_size])
+    estimate = elapsed * (n / sample_size) ** 2
+    print(
+        f"legacy:    {sample_size:>7} profiles in {elapsed:.3f}s, "
+        f"~{estimate / 3600:.1f}h estimated for {n}"
+    )
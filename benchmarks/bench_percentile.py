@@ -0,0 +1,59 @@
+"""
+Benchmark of percentile normalization: the previous list.index based loop
+against the vectorized normalization.percentile_scores.
+
+Usage:
+    python benchmarks/bench_percentile.py [n]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from normalization import percentile_scores  # noqa: E402
+
+
+def legacy_percentile_scores(scores):
+    sorted_scores = sorted(scores)
+    normalized = []
+    for score in scores:
+        rank = sorted_scores.index(score)
+        percentile = (
+            (rank / (len(sorted_scores) - 1)) * 100 if len(sorted_scores) > 1 else 50
+        )
+        if percentile < 50:
+            adjusted_score = 25 * (percentile / 50) ** 0.8
+        else:
+            adjusted_score = 75 + 25 * ((percentile - 50) / 50) ** 1.2
+        normalized.append(round(adjusted_score))
+    return normalized
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    # Gemini scores are integers, so ties are the common case
+    scores = rng.integers(0, 101, size=n)
+
+    vectorized = timed(percentile_scores, scores)
+    print(f"vectorized: {n:>9} scores in {vectorized:.3f}s")
+
+    # The legacy loop is quadratic, time it on a sample and extrapolate
+    sample_size = min(n, 20_000)
+    sample = rng.random(sample_size).tolist()
+    legacy = timed(legacy_percentile_scores, sample)
+    estimate = legacy * (n / sample_size) ** 2
+    print(
+        f"legacy:     {sample_size:>9} scores in {legacy:.3f}s, "
+        f"~{estimate / 3600:.1f}h estimated for {n}"
+    )
@@ -0,0 +1,270 @@
+"""
+Local stand-ins for the external services, so benchmarks run offline:
+a fake Gemini client, a Linkd search stub server and a MongoDB client.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import random
+import re
+import threading
+import time
+import types
+import typing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SAMPLE_DATA = os.path.join(os.path.dirname(__file__), "..", "sample_data")
+
+STAGES = ["Pre-Seed", "Seed", "Series A", "Series B", "Series C", "Growth"]
+INDUSTRIES = ["AI", "Fintech", "Health", "Climate", "SaaS", "Consumer", "Robotics"]
+LOCATIONS = ["Los Angeles", "San Francisco", "New York", "Austin", "Singapore"]
+
+
+def _fake_value(name, kind, rng):
+    """
+    Plausible value for a response field from its name and JSON or Python type.
+    """
+    if name == "score":
+        return rng.randint(0, 100)
+    if name == "funding":
+        return rng.choice([0, 250_000, 1_000_000, 5_000_000, 20_000_000])
+    if name == "stage":
+        return rng.choice(STAGES)
+    if name == "Industry":
+        return (
+            [rng.choice(INDUSTRIES)]
+            if kind in (list, "array")
+            else rng.choice(INDUSTRIES)
+        )
+    if name == "Location":
+        return rng.choice(LOCATIONS)
+    if kind in (int, "integer"):
+        return rng.randint(0, 1000)
+    if kind in (float, "number"):
+        return round(rng.uniform(0, 1000), 2)
+    if kind in (list, "array"):
+        return []
+    return f"{name} {rng.randint(0, 9999)}"
+
+
+def fake_response_data(schema, prompt, rng):
+    """
+    Returns JSON-compatible data valid for response_schema, which may be a
+    pydantic model, a list[...] of one, or a JSON schema dict.
+    """
+    if typing.get_origin(schema) is list:
+        (item_schema,) = typing.get_args(schema)
+        # Batch prompts list one "Startup id: ..." line per requested item
+        ids = re.findall(r"Startup id: (\S+)", prompt) or ["0"]
+        return [
+            {**fake_response_data(item_schema, prompt, rng), "id": startup_id}
+            for startup_id in ids
+        ]
+    if hasattr(schema, "model_fields"):
+        return {
+            name: _fake_value(
+                name, typing.get_origin(field.annotation) or field.annotation, rng
+            )
+            for name, field in schema.model_fields.items()
+        }
+    return {
+        name: _fake_value(name, spec.get("type"), rng)
+        for name, spec in schema.get("properties", {}).items()
+    }
+
+
+class FakeModels:
+    def __init__(self, latency, calls):
+        self.latency = latency
+        self.calls = calls
+
+    def _response(self, model, contents, config):
+        self.calls["n"] += 1
+        # Seeded by the prompt so repeated runs produce the same data
+        rng = random.Random(contents)
+        data = fake_response_data(config["response_schema"], contents, rng)
+        text = json.dumps(data)
+        usage = types.SimpleNamespace(
+            prompt_token_count=len(contents) // 4 + 1,
+            candidates_token_count=len(text) // 4 + 1,
+            thoughts_token_count=0,
+        )
+        return types.SimpleNamespace(text=text, usage_metadata=usage)
+
+    def generate_content(self, model, contents, config):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response(model, contents, config)
+
+
+class FakeAsyncModels(FakeModels):
+    async def generate_content(self, model, contents, config):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._response(model, contents, config)
+
+
+class FakeGeminiClient:
+    """
+    Drop-in for genai.Client answering generate_content with schema-valid
+    JSON after `latency` seconds. calls["n"] counts requests.
+    """
+
+    def __init__(self, latency=0.0):
+        self.calls = {"n": 0}
+        self.models = FakeModels(latency, self.calls)
+        self.aio = types.SimpleNamespace(models=FakeAsyncModels(latency, self.calls))
+
+
+def inflate_profile(profile, index):
+    """
+    Copy of a Linkd result made unique by index: profile id, LinkedIn URL,
+    name and company names all change, so entity resolution treats every
+    copy as a different founder and startup.
+    """
+    profile = copy.deepcopy(profile)
+    person = profile["profile"]
+    person["id"] = index
+    person["name"] = f"{person.get('name', 'Founder')} {index}"
+    person["linkedin_url"] = f"{person.get('linkedin_url', '')}-{index}"
+    for experience in profile.get("experience", []):
+        experience["company_name"] = f"{experience.get('company_name', '')} {index}"
+    return profile
+
+
+def load_linkd_sample():
+    with open(os.path.join(SAMPLE_DATA, "linkd_results.json")) as f:
+        return json.load(f)["results"]
+
+
+def load_founder_sample():
+    with open(os.path.join(SAMPLE_DATA, "founder_data.json")) as f:
+        return json.load(f)
+
+
+def inflate_founders(n):
+    """
+    n distinct founder records built from sample_data/founder_data.json.
+    """
+    sample = load_founder_sample()
+    records = []
+    for index in range(n):
+        record = copy.deepcopy(sample[index % len(sample)])
+        record["_id"] = str(index)
+        record["Name"] = f"{record['Name']} {index}"
+        record["Founder_LinkedIn"] = {
+            name: f"{url}-{index}"
+            for name, url in (record.get("Founder_LinkedIn") or {}).items()
+        }
+        records.append(record)
+    return records
+
+
+def inflate_companies(n, seed=0):
+    """
+    n scored company documents shaped like the startups collection.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "Name": f"Company {index}",
+            "Description": "Benchmark company",
+            "Industry": [rng.choice(INDUSTRIES)],
+            "Location": rng.choice(LOCATIONS),
+            "Funding Status": rng.choice(STAGES),
+            "stage": rng.choice(STAGES),
+            "funding": rng.choice([0, 250_000, 1_000_000, 5_000_000, 20_000_000]),
+            "score": rng.randint(0, 100),
+        }
+        for index in range(n)
+    ]
+
+
+class LinkdStubServer:
+    """
+    Local Linkd search API serving `total` inflated copies of
+    sample_data/linkd_results.json, paged by limit and offset.
+    Use as a context manager; `url` is the search endpoint.
+
+    `failures` lists (status, Retry-After or None) responses sent, in order,
+    to the first requests instead of a page, to exercise client retries.
+    """
+
+    def __init__(self, total, latency=0.0, failures=()):
+        sample = load_linkd_sample()
+        self.requests = 0
+        self.failures = list(failures)
+        lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with lock:
+                    server.requests += 1
+                    failure = server.failures.pop(0) if server.failures else None
+                if latency:
+                    time.sleep(latency)
+                if failure is not None:
+                    status, retry_after = failure
+                    self.send_response(status)
+                    if retry_after is not None:
+                        self.send_header("Retry-After", str(retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                params = parse_qs(urlparse(self.path).query)
+                offset = int(params.get("offset", ["0"])[0])
+                limit = int(params.get("limit", ["30"])[0])
+                results = [
+                    inflate_profile(sample[index % len(sample)], index)
+                    for index in range(offset, min(offset + limit, total))
+                ]
+                body = json.dumps(
+                    {
+                        "results": results,
+                        "total": total,
+                        "query": params.get("query", [""])[0],
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}/api/search/users"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def mongo_client():
+    """
+    MongoDB client for benchmarks: a real server when BENCH_MONGODB_URI is
+    set, otherwise an in-memory mongomock client.
+    """
+    uri = os.getenv("BENCH_MONGODB_URI")
+    if uri:
+        from pymongo import MongoClient
+
+        return MongoClient(uri)
+
+    import mongomock
+
+    return mongomock.MongoClient()
@@ -0,0 +1,84 @@
+"""
+Concurrent load test of POST /api/companies. Run it once against the Flask
+server (python app.py or gunicorn app:app) and once against the ASGI server
+(uvicorn asgi_app:app) to compare throughput.
+
+Usage:
+    python benchmarks/load_test.py [url] [--concurrency N] [--duration S]
+        [--body JSON] [--params QUERY] [--method GET]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import numpy as np
+
+
+async def worker(client, method, url, body, params, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=body, params=params)
+            await response.aread()
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(url, concurrency, duration, body, params, method="POST"):
+    latencies = []
+    errors = []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            *(
+                worker(client, method, url, body, params, deadline, latencies, errors)
+                for _ in range(concurrency)
+            )
+        )
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_s": round(len(latencies) / duration, 1),
+        "p50_ms": (
+            round(float(np.percentile(latencies, 50)), 1) if len(latencies) else None
+        ),
+        "p95_ms": (
+            round(float(np.percentile(latencies, 95)), 1) if len(latencies) else None
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("url", nargs="?", default="http://127.0.0.1:5000/api/companies")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--body", default="{}", help="JSON filter body")
+    parser.add_argument("--params", default="limit=50", help="query string")
+    parser.add_argument("--method", default="POST")
+    args = parser.parse_args()
+
+    params = dict(pair.split("=", 1) for pair in args.params.split("&") if "=" in pair)
+    body = json.loads(args.body) if args.method == "POST" else None
+    result = asyncio.run(
+        run(args.url, args.concurrency, args.duration, body, params, args.method)
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Compares the size of the Gemini prompts built from sample_data/founder_data.json
+before and after prompt compaction: the enrichment prompt of every record,
+the single evaluation prompt and one batch evaluation prompt over all records.
+Tokens are counted with prompts.count_tokens, set TOKEN_COUNTER=local to use
+the Gemini tokenizer.
+
+Usage:
+    python benchmarks/prompt_sizes.py [--input sample_data/founder_data.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fakes import SAMPLE_DATA  # noqa: E402
+
+WORKDIR = tempfile.mkdtemp(prefix="startup-prompts-")
+# Must be set before the application modules are imported
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ["RATE_LIMIT_PATH"] = os.path.join(WORKDIR, "rate_limits.sqlite")
+os.environ["LLM_CACHE_PATH"] = os.path.join(WORKDIR, "llm_cache.sqlite")
+os.environ["LOG_LEVEL"] = os.getenv("BENCH_LOG_LEVEL", "WARNING")
+
+import startup_evaluation  # noqa: E402
+from prompts import build_fill_prompt, count_tokens  # noqa: E402
+
+
+def legacy_fill_prompt(startup_data):
+    return f"""
+    Fill the following startup data:
+    {startup_data}
+    """
+
+
+def legacy_startup_metrics(startup):
+    return f"""
+        Company Overview:
+        - Name: {startup.get('Name', 'Unknown')}
+        - Industry: {startup.get('Industry', 'Unknown')}
+        - Location: {startup.get('Location', 'Unknown')}
+        - Launch Date: {startup.get('Launch Date', 'Unknown')}
+        - Description: {startup.get('Description', 'Unknown')}
+
+        Traction & Growth:
+        - Early Metrics: {startup.get('Early Metrics', 'Unknown')}
+        - Press Coverage: {startup.get('Press', 'Unknown')}
+
+        Team:
+        - Founders: {startup.get('Founders', 'Unknown')}
+        - Website: {startup.get('Website', 'Unknown')}
+        - Funding Status: {startup.get('Funding Status', 'Unknown')}
+"""
+
+
+def legacy_evaluation_prompt(startup):
+    return f"""
+        Consider the following startup metrics and evaluate a score from 0-100:
+        {legacy_startup_metrics(startup)}
+        {startup_evaluation.EVALUATION_CRITERIA}
+        Please provide a single numerical score between 0-100.
+        From funding status, determine the state of the startup and funding in dollars as number.
+
+        return your response as:
+        {{
+            "score": int,
+            "funding": int,
+            "stage": str
+        }}
+    """
+
+
+def legacy_batch_evaluation_prompt(startups):
+    sections = "\n".join(f"""
+        Startup id: {startup["_id"]}
+        {legacy_startup_metrics(startup)}""" for startup in startups)
+    return f"""
+        Consider the following {len(startups)} startups and evaluate each one with a score from 0-100:
+        {sections}
+        {startup_evaluation.EVALUATION_CRITERIA}
+        For every startup provide a single numerical score between 0-100.
+        From funding status, determine the state of the startup and funding in dollars as number.
+
+        return your response as a list with one entry per startup, using the startup id given above:
+        [
+            {{
+                "id": str,
+                "score": int,
+                "funding": int,
+                "stage": str
+            }}
+        ]
+    """
+
+
+def compare(name, before, after):
+    """
+    Size totals of the before and after prompts of one prompt kind.
+    """
+    before_tokens = sum(map(count_tokens, before))
+    after_tokens = sum(map(count_tokens, after))
+    return {
+        "prompt": name,
+        "prompts": len(before),
+        "chars_before": sum(map(len, before)),
+        "chars_after": sum(map(len, after)),
+        "tokens_before": before_tokens,
+        "tokens_after": after_tokens,
+        "tokens_saved_pct": round(100 * (1 - after_tokens / before_tokens), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--input", default=os.path.join(SAMPLE_DATA, "founder_data.json")
+    )
+    args = parser.parse_args()
+    with open(args.input) as f:
+        records = json.load(f)
+
+    results = [
+        compare(
+            "fill_startup_data",
+            [legacy_fill_prompt(record) for record in records],
+            [build_fill_prompt(record) for record in records],
+        ),
+        compare(
+            "evaluate_startup_score",
+            [legacy_evaluation_prompt(record) for record in records],
+            [startup_evaluation.build_evaluation_prompt(record) for record in records],
+        ),
+        compare(
+            "evaluate_startup_batch",
+            [legacy_batch_evaluation_prompt(records)],
+            [startup_evaluation.build_batch_evaluation_prompt(records)],
+        ),
+    ]
+    print(json.dumps({"input": args.input, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+End-to-end throughput benchmarks that run offline against local fakes:
+a fake Gemini client, a Linkd stub server and mongomock (or the mongod at
+BENCH_MONGODB_URI). Results are written as JSON so runs on different
+commits can be compared. mongomock is a benchmark-only dependency
+(pip install mongomock).
+
+mongomock scans the collection for every update and keyset query, so its
+cost grows quadratically: with mongomock the default sizes stop at 10k, and
+100k runs are meant for BENCH_MONGODB_URI=mongodb://localhost:27017/bench.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 1000,10000,100000]
+        [--only ingestion,enrichment,scoring,scoring_job,incremental_scoring,
+            companies_api,snapshot]
+        [--gemini-latency 0.0] [--output results.json] [--baseline old.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fakes import (  # noqa: E402
+    FakeGeminiClient,
+    LinkdStubServer,
+    inflate_companies,
+    inflate_founders,
+    mongo_client,
+)
+
+WORKDIR = tempfile.mkdtemp(prefix="startup-bench-")
+# Must be set before the application modules are imported
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ["JOB_WORKERS"] = "0"
+os.environ["GEMINI_RPM"] = os.environ["GEMINI_TPM"] = os.environ["LINKD_RPM"] = "0"
+os.environ["RATE_LIMIT_PATH"] = os.path.join(WORKDIR, "rate_limits.sqlite")
+os.environ["LOG_LEVEL"] = os.getenv("BENCH_LOG_LEVEL", "WARNING")
+
+MONGO = mongo_client()
+
+import pymongo  # noqa: E402
+
+# Every module connecting at import time gets the shared benchmark client
+pymongo.MongoClient = lambda *args, **kwargs: MONGO
+
+import app  # noqa: E402
+import linkd  # noqa: E402
+import process_founder  # noqa: E402
+import startup_evaluation  # noqa: E402
+from columnar import SNAPSHOT_PROJECTION, Snapshot, export_snapshot  # noqa: E402
+from company_stats import (  # noqa: E402
+    FACET_FIELDS,
+    compute_company_stats,
+    facet_counts,
+)
+from entity_index import EntityIndex  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+
+# Page requests timed by the /api/companies benchmark
+API_REQUESTS = 200
+# Description length of the companies in the snapshot benchmark, close to
+# the scraped descriptions stored in production
+DESCRIPTION_CHARS = 2000
+
+
+def result(benchmark, records, seconds, **extra):
+    return {
+        "benchmark": benchmark,
+        "records": records,
+        "seconds": round(seconds, 4),
+        "records_per_s": round(records / seconds, 1) if seconds else None,
+        **extra,
+    }
+
+
+def reset_collection(collection, documents):
+    collection.drop()
+    if documents:
+        collection.insert_many(documents)
+
+
+def bench_ingestion(n, gemini_latency):
+    """
+    Work of a UCLA ingestion job: Linkd paging, founder extraction, entity resolution,
+    enrichment and writing founder_data.
+    """
+    gemini = FakeGeminiClient(gemini_latency)
+    app.gemini_client = gemini
+    app.llm_cache = LLMCache(":memory:")
+    app.entity_index = EntityIndex(":memory:")
+    app.FOUNDER_DATA_PATH = os.path.join(WORKDIR, "founder_data.ndjson")
+
+    with LinkdStubServer(n) as stub:
+        linkd._client = linkd.LinkdClient(url=stub.url, token="benchmark")
+        start = time.perf_counter()
+        data = asyncio.run(app.get_UCLA_alumnis("Founders"))
+        elapsed = time.perf_counter() - start
+
+    return result(
+        "ingestion",
+        n,
+        elapsed,
+        profiles=data["total"],
+        linkd_requests=stub.requests,
+        gemini_requests=gemini.calls["n"],
+    )
+
+
+def bench_enrichment(n, gemini_latency):
+    """
+    process_founder.process_founders over n founder records, every one enriched.
+    """
+    input_path = os.path.join(WORKDIR, "founders.json")
+    output_path = os.path.join(WORKDIR, "processed_founders.json")
+    with open(input_path, "w") as f:
+        json.dump(inflate_founders(n), f)
+
+    gemini = FakeGeminiClient(gemini_latency)
+    process_founder.client = gemini
+    process_founder.llm_cache = LLMCache(":memory:")
+
+    start = time.perf_counter()
+    asyncio.run(process_founder.process_founders(input_path, output_path, full=True))
+    elapsed = time.perf_counter() - start
+    return result("enrichment", n, elapsed, gemini_requests=gemini.calls["n"])
+
+
+def bench_scoring(n, gemini_latency):
+    """
+    startup_evaluation: load, batched evaluation, percentile normalization
+    and bulk write of n companies.
+    """
+    reset_collection(startup_evaluation.companies_collection, inflate_companies(n))
+    gemini = FakeGeminiClient(gemini_latency)
+    startup_evaluation.client = gemini
+    startup_evaluation.llm_cache = LLMCache(":memory:")
+
+    start = time.perf_counter()
+    companies = startup_evaluation.get_all_companies()
+    loaded = time.perf_counter()
+    startup_evaluation.evaluate_startup_scores(companies)
+    evaluated = time.perf_counter()
+    startup_evaluation.normalize_company_scores(companies, "percentile")
+    elapsed = time.perf_counter() - start
+
+    return result(
+        "scoring",
+        n,
+        elapsed,
+        load_seconds=round(loaded - start, 4),
+        evaluate_seconds=round(evaluated - loaded, 4),
+        normalize_seconds=round(start + elapsed - evaluated, 4),
+        gemini_requests=gemini.calls["n"],
+    )
+
+
+def bench_scoring_job(n, gemini_latency):
+    """
+    startup_evaluation.run_scoring_job over n unscored companies.
+    """
+    companies = inflate_companies(n)
+    for company in companies:
+        del company["score"]
+    reset_collection(startup_evaluation.companies_collection, companies)
+    gemini = FakeGeminiClient(gemini_latency)
+    startup_evaluation.client = gemini
+    startup_evaluation.llm_cache = LLMCache(":memory:")
+
+    start = time.perf_counter()
+    summary = startup_evaluation.run_scoring_job()
+    elapsed = time.perf_counter() - start
+    return result(
+        "scoring_job",
+        n,
+        elapsed,
+        score_writes=summary["score_writes"],
+        gemini_requests=gemini.calls["n"],
+    )
+
+
+def bench_incremental_scoring(n, gemini_latency):
+    """
+    One new company added to n scored ones: score_new_companies through the
+    raw score index against a run_scoring_job pass over the collection.
+    """
+    companies = inflate_companies(n)
+    for company in companies:
+        del company["score"]
+    reset_collection(startup_evaluation.companies_collection, companies)
+    startup_evaluation.score_index.collection.drop()
+    gemini = FakeGeminiClient(gemini_latency)
+    startup_evaluation.client = gemini
+    startup_evaluation.llm_cache = LLMCache(":memory:")
+    startup_evaluation.run_scoring_job()
+
+    def add_company(name):
+        (company,) = inflate_companies(1, seed=n)
+        del company["score"]
+        company["Name"] = name
+        startup_evaluation.companies_collection.insert_one(company)
+
+    add_company("Incremental")
+    start = time.perf_counter()
+    summary = startup_evaluation.score_new_companies()
+    elapsed = time.perf_counter() - start
+
+    add_company("Full pass")
+    start = time.perf_counter()
+    full = startup_evaluation.run_scoring_job()
+    full_seconds = time.perf_counter() - start
+
+    return result(
+        "incremental_scoring",
+        n,
+        elapsed,
+        score_writes=summary["score_writes"],
+        full_job_seconds=round(full_seconds, 4),
+        full_job_score_writes=full["score_writes"],
+    )
+
+
+def bench_companies_api(n, gemini_latency):
+    """
+    POST /api/companies through the Flask test client: one unpaged stream of
+    every company, then API_REQUESTS sorted and filtered page requests.
+    """
+    reset_collection(app.companies_collection, inflate_companies(n))
+    client = app.app.test_client()
+
+    start = time.perf_counter()
+    response = client.post("/api/companies", json={})
+    streamed = len(json.loads(response.get_data()))
+    stream_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cursor = None
+    for index in range(API_REQUESTS):
+        if index % 2:
+            params = {"limit": 50, "sort": "score"}
+            if cursor:
+                params["cursor"] = cursor
+            page = client.post("/api/companies", json={}, query_string=params)
+            cursor = page.get_json()["next_cursor"]
+        else:
+            page = client.post(
+                "/api/companies",
+                json={"industry": ["AI"], "limit": 50, "sort": "funding"},
+            )
+        if page.status_code != 200:
+            raise RuntimeError(f"/api/companies returned {page.status_code}")
+    page_seconds = time.perf_counter() - start
+
+    return result(
+        "companies_api",
+        n,
+        stream_seconds + page_seconds,
+        streamed=streamed,
+        stream_seconds=round(stream_seconds, 4),
+        page_requests=API_REQUESTS,
+        page_requests_per_s=round(API_REQUESTS / page_seconds, 1),
+    )
+
+
+def measure(function):
+    """
+    Runs function and returns its result, seconds and peak traced memory in
+    MiB. Memory-mapped pages are not traced, only Python and NumPy heap.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return value, elapsed, round(peak / 2**20, 2)
+
+
+def bench_snapshot(n, gemini_latency):
+    """
+    Offline re-normalization and facet counts of n companies: the dict path
+    loading every document against the memory-mapped columnar snapshot.
+    Nothing is written back, so both paths do the same work.
+    """
+    companies = inflate_companies(n)
+    for company in companies:
+        company["Description"] = "x" * DESCRIPTION_CHARS
+        company["raw_score"] = company["score"]
+    reset_collection(startup_evaluation.companies_collection, companies)
+    path = os.path.join(WORKDIR, "snapshot")
+
+    def dict_path():
+        companies = startup_evaluation.get_all_companies()
+        startup_evaluation.normalize([c["raw_score"] for c in companies], "percentile")
+        return compute_company_stats(companies)["facets"]
+
+    def snapshot_path():
+        snapshot = Snapshot(path)
+        startup_evaluation.normalize_snapshot(path, write=False)
+        return {
+            facet: facet_counts(snapshot.value_counts(field))
+            for field, facet in FACET_FIELDS.items()
+        }
+
+    dict_facets, dict_seconds, dict_peak = measure(dict_path)
+    _, export_seconds, export_peak = measure(
+        lambda: export_snapshot(
+            startup_evaluation.companies_collection.find({}, SNAPSHOT_PROJECTION), path
+        )
+    )
+    snapshot_facets, snapshot_seconds, snapshot_peak = measure(snapshot_path)
+    if snapshot_facets != dict_facets:
+        raise RuntimeError("snapshot facets differ from the dict path")
+
+    return result(
+        "snapshot",
+        n,
+        snapshot_seconds,
+        dict_seconds=round(dict_seconds, 4),
+        dict_peak_mib=dict_peak,
+        export_seconds=round(export_seconds, 4),
+        export_peak_mib=export_peak,
+        snapshot_peak_mib=snapshot_peak,
+        speedup=round(dict_seconds / snapshot_seconds, 1),
+    )
+
+
+BENCHMARKS = {
+    "ingestion": bench_ingestion,
+    "enrichment": bench_enrichment,
+    "scoring": bench_scoring,
+    "scoring_job": bench_scoring_job,
+    "incremental_scoring": bench_incremental_scoring,
+    "companies_api": bench_companies_api,
+    "snapshot": bench_snapshot,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path):
+    """
+    Prints the records_per_s change of every benchmark also in the baseline.
+    """
+    with open(baseline_path) as f:
+        baseline = {
+            (entry["benchmark"], entry["records"]): entry
+            for entry in json.load(f)["results"]
+        }
+    for entry in results:
+        previous = baseline.get((entry["benchmark"], entry["records"]))
+        if previous and previous.get("records_per_s") and entry["records_per_s"]:
+            change = entry["records_per_s"] / previous["records_per_s"]
+            print(
+                f"{entry['benchmark']:>14} {entry['records']:>7}: "
+                f"{previous['records_per_s']:>10} -> {entry['records_per_s']:>10} "
+                f"records/s ({change:.2f}x)",
+                file=sys.stderr,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000" if os.getenv("BENCH_MONGODB_URI") else "1000,10000",
+    )
+    parser.add_argument("--only", default=",".join(BENCHMARKS))
+    parser.add_argument(
+        "--gemini-latency",
+        type=float,
+        default=0.0,
+        help="seconds the fake Gemini client waits per request",
+    )
+    parser.add_argument("--output", help="write results here instead of stdout")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = args.only.split(",")
+    results = []
+    for name in names:
+        for n in sizes:
+            entry = BENCHMARKS[name](n, args.gemini_latency)
+            print(json.dumps(entry), file=sys.stderr)
+            results.append(entry)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "mongo": "mongod" if os.getenv("BENCH_MONGODB_URI") else "mongomock",
+        "gemini_latency": args.gemini_latency,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Cold start and steady-state throughput of the WSGI app: the import time of
+app.py, the time until a freshly started server answers, and requests/s
+under load for the Flask dev server (python app.py) and gunicorn with
+gunicorn.conf.py.
+
+Without BENCH_MONGODB_URI only GET / is loaded, which measures the servers
+themselves. With it, MONGODB_URI points every server process there and
+POST /api/companies and GET /ready are loaded too.
+
+Usage:
+    python benchmarks/serving.py [--duration 10] [--concurrency 32]
+        [--servers dev,gunicorn] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from load_test import run
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WORKDIR = tempfile.mkdtemp(prefix="startup-serving-")
+# Runs of the import timing, the median is reported
+IMPORT_RUNS = 5
+# Seconds a server gets to answer its first request
+BOOT_TIMEOUT = 60
+
+SERVERS = {
+    "dev": ([sys.executable, "app.py"], 5000),
+    "gunicorn": (["gunicorn", "app:app"], 8000),
+}
+
+
+def server_env():
+    env = dict(
+        os.environ,
+        JOB_WORKERS="0",
+        LOG_LEVEL="WARNING",
+        PORT="8000",
+        RATE_LIMIT_PATH=os.path.join(WORKDIR, "rate_limits.sqlite"),
+        LLM_CACHE_PATH=os.path.join(WORKDIR, "llm_cache.sqlite"),
+        ENTITY_INDEX_PATH=os.path.join(WORKDIR, "entity_index.sqlite"),
+    )
+    env.setdefault("GEMINI_API_KEY", "benchmark")
+    if os.getenv("BENCH_MONGODB_URI"):
+        env["MONGODB_URI"] = os.environ["BENCH_MONGODB_URI"]
+    return env
+
+
+def import_seconds():
+    """
+    Median seconds a fresh interpreter takes to import app.
+    """
+    code = "import time; s = time.perf_counter(); import app; print(time.perf_counter() - s)"
+    runs = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=ROOT,
+                env=server_env(),
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.split()[-1]
+        )
+        for _ in range(IMPORT_RUNS)
+    ]
+    return round(statistics.median(runs), 3)
+
+
+def start_server(name):
+    """
+    Starts a server and waits for its first answer to GET /.
+
+    Returns:
+        tuple: (process, base url, seconds until the first answer)
+    """
+    command, port = SERVERS[name]
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env=server_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    while time.perf_counter() - start < BOOT_TIMEOUT:
+        try:
+            if httpx.get(f"{url}/", timeout=1).status_code == 200:
+                return process, url, round(time.perf_counter() - start, 3)
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"{name} did not answer within {BOOT_TIMEOUT}s")
+
+
+def bench_server(name, duration, concurrency):
+    process, url, boot_seconds = start_server(name)
+    targets = [("GET", "/", None, {})]
+    if os.getenv("BENCH_MONGODB_URI"):
+        targets += [
+            ("POST", "/api/companies", {}, {"limit": "50"}),
+            ("GET", "/ready", None, {}),
+        ]
+    try:
+        loads = [
+            asyncio.run(
+                run(f"{url}{path}", concurrency, duration, body, params, method)
+            )
+            for method, path, body, params in targets
+        ]
+    finally:
+        process.terminate()
+        process.wait()
+    return {"server": name, "boot_seconds": boot_seconds, "loads": loads}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--servers", default=",".join(SERVERS))
+    parser.add_argument("--output", help="write results here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "import_seconds": import_seconds(),
+        "servers": [
+            bench_server(name, args.duration, args.concurrency)
+            for name in args.servers.split(",")
+        ],
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Process-local MongoDB and Gemini clients for the WSGI app.
+
+Clients are created on first use and again in every forked process, so a
+gunicorn worker never inherits the connection pool or monitor threads of
+its parent. Pool sizes come from the environment; size MONGO_POOL_SIZE to
+at least the threads per worker.
+"""
+
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from google import genai
+from pymongo import MongoClient, monitoring
+
+from metrics import get_logger
+
+load_dotenv()
+
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+DATABASE_NAME = "startup_database"
+# Connections per process, shared with the Motor client of asgi_app.py
+MONGO_POOL_SIZE = int(os.getenv("MONGO_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+# Milliseconds a request waits for a server or a free pooled connection
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", "5000"))
+
+log = get_logger("clients")
+
+
+class ProcessLocal:
+    """
+    Value built by factory() on first use in each process. A process forked
+    after the value was built builds its own instead of sharing it.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._value = None
+
+    def get(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._value = self.factory()
+                    self._pid = os.getpid()
+        return self._value
+
+    def peek(self):
+        """
+        The value of this process, None when it has not been built yet.
+        """
+        return self._value if self._pid == os.getpid() else None
+
+
+class LazyProxy:
+    """
+    Forwards attribute access to resolve(), so module-level names such as
+    companies_collection can be bound before any client exists.
+    """
+
+    def __init__(self, resolve):
+        self._resolve = resolve
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+
+class PoolListener(monitoring.ConnectionPoolListener):
+    """
+    Counts the open and checked out connections of a client's pools.
+    """
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.wait_timeouts = 0
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_closed(self, event):
+        self.open -= 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    def connection_check_out_failed(self, event):
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+            self.wait_timeouts += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+
+def create_mongo_client():
+    listener = PoolListener()
+    client = MongoClient(
+        MONGODB_URI,
+        maxPoolSize=MONGO_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=MONGO_TIMEOUT_MS,
+        waitQueueTimeoutMS=MONGO_TIMEOUT_MS,
+        event_listeners=[listener],
+    )
+    log.info("mongo_client_created", pid=os.getpid(), max_pool_size=MONGO_POOL_SIZE)
+    return client, listener
+
+
+def create_gemini_client():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    log.info("gemini_client_created", pid=os.getpid())
+    return client
+
+
+_mongo = ProcessLocal(create_mongo_client)
+_gemini = ProcessLocal(create_gemini_client)
+
+
+def get_mongo_client():
+    return _mongo.get()[0]
+
+
+def get_database():
+    return get_mongo_client()[DATABASE_NAME]
+
+
+def get_gemini_client():
+    return _gemini.get()
+
+
+def lazy_collection(name):
+    """
+    Collection of the startup database resolved through the client of the
+    current process on every use.
+    """
+    return LazyProxy(lambda: get_database()[name])
+
+
+def pool_status():
+    """
+    Readiness of this process: a timed MongoDB ping with the pool counters,
+    and whether the Gemini client exists yet.
+
+    Returns:
+        dict: {"ready": bool, "pid": int, "mongo": {...}, "gemini": {...}}
+    """
+    client, listener = _mongo.get()
+    mongo = {
+        "max_pool_size": MONGO_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        "open_connections": listener.open,
+        "checked_out": listener.checked_out,
+        "wait_timeouts": listener.wait_timeouts,
+    }
+    start = time.perf_counter()
+    try:
+        client.admin.command("ping")
+        mongo["ping_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        ready = True
+    except Exception as e:
+        mongo["error"] = str(e)
+        ready = False
+    return {
+        "ready": ready,
+        "pid": os.getpid(),
+        "mongo": mongo,
+        "gemini": {"initialized": _gemini.peek() is not None},
+    }
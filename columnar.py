@@ -0,0 +1,205 @@
+"""
+Columnar snapshot of the numeric and categorical startup fields.
+
+A snapshot is a directory holding one .npy file per column and meta.json.
+Unlike an .npz archive every column can be memory-mapped, so offline
+normalization and facet counts read only the pages they touch.
+
+Columns:
+    id, id_is_oid: _id as bytes (ObjectId binary or UTF-8 string) and its kind
+    score, raw_score, funding: float64, NaN when missing
+    stage, Location: int32 dictionary codes, -1 when missing
+    Industry_codes, Industry_offsets: multi-valued Industry in CSR layout,
+        the codes of company i are Industry_codes[offsets[i]:offsets[i + 1]]
+
+Usage:
+    python columnar.py export <snapshot dir>
+"""
+
+import json
+import os
+import shutil
+import sys
+from array import array
+
+import numpy as np
+from bson import ObjectId
+
+SNAPSHOT_VERSION = 1
+NUMERIC_FIELDS = ("score", "raw_score", "funding")
+CATEGORICAL_FIELDS = ("stage", "Location")
+MULTI_VALUED_FIELDS = ("Industry",)
+# Projection of the documents read by export_snapshot
+SNAPSHOT_PROJECTION = {
+    field: 1 for field in (*NUMERIC_FIELDS, *CATEGORICAL_FIELDS, *MULTI_VALUED_FIELDS)
+}
+
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def _categories(value):
+    values = value if isinstance(value, list) else [value]
+    return [value for value in values if isinstance(value, str) and value]
+
+
+class _Dictionary:
+    """
+    Assigns int32 codes to category values in order of first appearance.
+    """
+
+    def __init__(self):
+        self.codes = {}
+
+    def encode(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.codes)
+        return self.codes[value]
+
+    @property
+    def values(self):
+        return list(self.codes)
+
+
+def export_snapshot(documents, path):
+    """
+    Writes the snapshot columns of documents to the directory path, replacing
+    an existing snapshot only once the new one is complete.
+
+    Args:
+        documents (iterable): Company documents or a cursor, read once
+        path (str): Snapshot directory
+
+    Returns:
+        int: Number of companies written
+    """
+    ids = []
+    id_is_oid = array("b")
+    numeric = {field: array("d") for field in NUMERIC_FIELDS}
+    dictionaries = {
+        field: _Dictionary() for field in (*CATEGORICAL_FIELDS, *MULTI_VALUED_FIELDS)
+    }
+    categorical = {field: array("i") for field in CATEGORICAL_FIELDS}
+    multi_codes = {field: array("i") for field in MULTI_VALUED_FIELDS}
+    multi_offsets = {field: array("q", [0]) for field in MULTI_VALUED_FIELDS}
+
+    for document in documents:
+        company_id = document["_id"]
+        is_oid = isinstance(company_id, ObjectId)
+        ids.append(company_id.binary if is_oid else str(company_id).encode())
+        id_is_oid.append(is_oid)
+        for field in NUMERIC_FIELDS:
+            numeric[field].append(_number(document.get(field)))
+        for field in CATEGORICAL_FIELDS:
+            values = _categories(document.get(field))
+            categorical[field].append(
+                dictionaries[field].encode(values[0]) if values else -1
+            )
+        for field in MULTI_VALUED_FIELDS:
+            for value in _categories(document.get(field)):
+                multi_codes[field].append(dictionaries[field].encode(value))
+            multi_offsets[field].append(len(multi_codes[field]))
+
+    columns = {
+        "id": np.array(ids, dtype=f"S{max(map(len, ids), default=1)}"),
+        "id_is_oid": np.frombuffer(id_is_oid, dtype=np.int8).astype(bool),
+    }
+    for field in NUMERIC_FIELDS:
+        columns[field] = np.frombuffer(numeric[field], dtype=np.float64)
+    for field in CATEGORICAL_FIELDS:
+        columns[field] = np.frombuffer(categorical[field], dtype=np.int32)
+    for field in MULTI_VALUED_FIELDS:
+        columns[f"{field}_codes"] = np.frombuffer(multi_codes[field], dtype=np.int32)
+        columns[f"{field}_offsets"] = np.frombuffer(
+            multi_offsets[field], dtype=np.int64
+        )
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "count": len(ids),
+        "columns": list(columns),
+        "dictionaries": {
+            field: dictionary.values for field, dictionary in dictionaries.items()
+        },
+    }
+
+    staging = f"{path.rstrip(os.sep)}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name, column in columns.items():
+        np.save(os.path.join(staging, f"{name}.npy"), column)
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(staging, path)
+    return len(ids)
+
+
+class Snapshot:
+    """
+    Snapshot columns loaded from a directory, memory-mapped by default.
+    """
+
+    def __init__(self, path, mmap=True):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {self.meta['version']}")
+        self.count = self.meta["count"]
+        self.dictionaries = self.meta["dictionaries"]
+        self.columns = {
+            name: np.load(
+                os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None
+            )
+            for name in self.meta["columns"]
+        }
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def ids(self, indices=None):
+        """
+        Decodes the _id of every company, or of the companies at indices.
+        """
+        raw = self["id"] if indices is None else self["id"][indices]
+        is_oid = self["id_is_oid"] if indices is None else self["id_is_oid"][indices]
+        return [
+            ObjectId(value.ljust(12, b"\0")) if oid else value.decode()
+            for value, oid in zip(raw, is_oid)
+        ]
+
+    def raw_scores(self):
+        """
+        raw_score, falling back to score for companies scored before raw
+        scores were stored; NaN for unscored companies.
+        """
+        return np.where(np.isnan(self["raw_score"]), self["score"], self["raw_score"])
+
+    def value_counts(self, field):
+        """
+        Counts the companies per value of a categorical or multi-valued field,
+        as {value: count} over the values present.
+        """
+        codes = self[f"{field}_codes"] if field in MULTI_VALUED_FIELDS else self[field]
+        codes = np.asarray(codes)
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.dictionaries[field]))
+        values = self.dictionaries[field]
+        return {values[code]: int(count) for code, count in enumerate(counts) if count}
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    if len(sys.argv) != 3 or sys.argv[1] != "export":
+        print(__doc__)
+        sys.exit(1)
+
+    load_dotenv()
+    db = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))[
+        "startup_database"
+    ]
+    count = export_snapshot(
+        db["startups"].find({}, SNAPSHOT_PROJECTION, batch_size=10_000), sys.argv[2]
+    )
+    print(f"Exported {count} companies to {sys.argv[2]}")
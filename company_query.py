@@ -0,0 +1,182 @@
+import base64
+
+from bson import ObjectId, json_util
+
+# Fields /api/companies results can be sorted by
+SORT_FIELDS = ("score", "funding")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# _id types in the startups collection, in BSON sort order: the plain string
+# ids of pipeline records, then ObjectIds of hand-inserted documents
+ID_TYPES = ("string", "objectId")
+
+
+def build_company_query(filters):
+    """
+    Builds the MongoDB filter for /api/companies from the request body.
+    """
+    query = {}
+
+    if "industry" in filters:
+        query["Industry"] = {"$in": filters["industry"]}
+
+    if "location" in filters:
+        query["Location"] = filters["location"]
+
+    if "funding" in filters:
+        query["funding"] = {"$gte": filters["funding"]}
+
+    if "stage" in filters:
+        query["stage"] = filters["stage"]
+
+    return query
+
+
+def parse_projection(fields):
+    """
+    Turns a list or comma separated string of field names into a projection.
+    Returns None, meaning all fields, when no fields are requested.
+    """
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return {field.strip(): 1 for field in fields if field.strip()}
+
+
+def parse_limit(limit):
+    limit = int(limit)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_sort(sort, order):
+    """
+    Returns the (field, direction) pair for a sort request, defaulting to _id order.
+    """
+    if sort is None:
+        return None, 1
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+    if order not in (None, "asc", "desc"):
+        raise ValueError("order must be asc or desc")
+    return sort, 1 if order == "asc" else -1
+
+
+def sort_spec(sort_field, direction):
+    # _id breaks ties so every document has a unique position for the cursor
+    if sort_field is None:
+        return [("_id", direction)]
+    return [(sort_field, direction), ("_id", direction)]
+
+
+def encode_cursor(document, sort_field):
+    """
+    Encodes the position of the last returned document as an opaque string.
+    """
+    position = {"id": document["_id"]}
+    if sort_field is not None:
+        position["value"] = document.get(sort_field)
+    return base64.urlsafe_b64encode(json_util.dumps(position).encode()).decode()
+
+
+def id_type(company_id):
+    return "objectId" if isinstance(company_id, ObjectId) else "string"
+
+
+def id_after(company_id, after):
+    """
+    _id condition for the documents after company_id. $gt and $lt only match
+    ids of the same BSON type, so ids of the types sorting after this one
+    are matched by type.
+    """
+    rank = ID_TYPES.index(id_type(company_id))
+    later = ID_TYPES[rank + 1 :] if after == "$gt" else ID_TYPES[:rank]
+    condition = {"_id": {after: company_id}}
+    if not later:
+        return condition
+    return {"$or": [condition, *({"_id": {"$type": type_}} for type_ in later)]}
+
+
+def decode_cursor(cursor):
+    try:
+        return json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("invalid cursor")
+
+
+def apply_cursor(query, cursor, sort_field, direction):
+    """
+    Restricts query to the documents after the cursor position in sort order.
+    Documents without the sort field sort as null, below every number.
+    """
+    if not cursor:
+        return query
+    position = decode_cursor(cursor)
+    after = "$gt" if direction == 1 else "$lt"
+
+    ids_after = id_after(position["id"], after)
+
+    if sort_field is None:
+        conditions = [ids_after]
+    elif position.get("value") is None:
+        conditions = [{sort_field: None, **ids_after}]
+        if direction == 1:
+            conditions.append({sort_field: {"$ne": None}})
+    else:
+        conditions = [
+            {sort_field: {after: position["value"]}},
+            {sort_field: position["value"], **ids_after},
+        ]
+        if direction == -1:
+            conditions.append({sort_field: None})
+
+    return {"$and": [query, {"$or": conditions}]} if query else {"$or": conditions}
+
+
+def serialize_company(company):
+    company["_id"] = str(company["_id"])
+    return company
+
+
+class CompaniesRequest:
+    """
+    Parsed /api/companies request: the MongoDB query plus paging options.
+    Paging options may be sent in the JSON body or as query string arguments.
+    Raises ValueError for invalid options.
+    """
+
+    def __init__(self, body, args):
+        filters = dict(body or {})
+
+        def param(name):
+            return filters.pop(name, None) or args.get(name)
+
+        limit = param("limit")
+        cursor = param("cursor")
+        fields = param("fields")
+        sort = param("sort")
+        order = param("order")
+        self.format = param("format")
+
+        self.limit = parse_limit(limit) if limit is not None else None
+        self.sort_field, self.direction = parse_sort(sort, order)
+        self.projection = parse_projection(fields)
+        if self.projection and self.sort_field:
+            self.projection[self.sort_field] = 1
+        self.query = apply_cursor(
+            build_company_query(filters), cursor, self.sort_field, self.direction
+        )
+        self.sort = sort_spec(self.sort_field, self.direction)
+
+    def page(self, documents):
+        """
+        Turns up to limit + 1 fetched documents into the serialized page and
+        the cursor of the next page, or None on the last page.
+        """
+        next_cursor = None
+        if len(documents) > self.limit:
+            documents = documents[: self.limit]
+            next_cursor = encode_cursor(documents[-1], self.sort_field)
+        return [serialize_company(document) for document in documents], next_cursor
@@ -0,0 +1,218 @@
+import heapq
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# _id of the materialized document in the company_stats collection
+COMPANY_STATS_ID = "companies"
+# Largest k served by /api/companies/top, and the length of the stored leaderboard
+TOP_K_MAX = int(os.getenv("TOP_K_MAX", "100"))
+# Company field -> facet name
+FACET_FIELDS = {"Industry": "industry", "stage": "stage", "Location": "location"}
+# Fields kept for every leaderboard entry
+TOP_FIELDS = ("_id", "Name", "Industry", "Location", "stage", "funding", "score")
+# Fields to read when refreshing the stats from the startups collection
+STATS_PROJECTION = {field: 1 for field in (*FACET_FIELDS, *TOP_FIELDS)}
+
+
+def facet_values(company, field):
+    value = company.get(field)
+    # Industry is a list, a company counts once in each of its industries
+    values = value if isinstance(value, list) else [value]
+    return [value for value in values if value not in (None, "")]
+
+
+def facet_counts(counts):
+    """
+    Facet as stored and served: a list of {"value", "count"} entries, most
+    common first, ties by value. Values stay data rather than field names,
+    so dots, dollar signs and empty strings are safe to store.
+    """
+    return [
+        {"value": value, "count": count}
+        for value, count in sorted(
+            counts.items(), key=lambda item: (-item[1], str(item[0]))
+        )
+    ]
+
+
+def stored_facets(document):
+    """
+    Facets of a stats document, converting documents stored before facets
+    were lists of {"value", "count"}.
+    """
+    return {
+        facet: facet_counts(counts) if isinstance(counts, dict) else counts
+        for facet, counts in document["facets"].items()
+    }
+
+
+# Body of the 404 the facets and top routes answer before the first refresh
+STATS_MISSING = {"error": "Company stats have not been computed yet"}
+
+
+def facets_body(stats):
+    """
+    Response body of /api/companies/facets from a stats document read with
+    stats_projection().
+    """
+    return {
+        "facets": stored_facets(stats),
+        "total": stats["total"],
+        "updated_at": stats["updated_at"],
+    }
+
+
+def top_body(stats):
+    """
+    Response body of /api/companies/top from a stats document read with
+    stats_projection(k).
+    """
+    return {"companies": stats["top"], "updated_at": stats["updated_at"]}
+
+
+def top_entry(company):
+    return {
+        field: str(company[field]) if field == "_id" else company[field]
+        for field in TOP_FIELDS
+        if field in company
+    }
+
+
+def compute_company_stats(companies, k=TOP_K_MAX):
+    """
+    Builds the materialized stats document from every company: facet counts
+    and the k best scored companies, ties broken by _id like /api/companies.
+
+    Args:
+        companies (iterable): Company dictionaries, consumed once
+        k (int): Leaderboard length
+
+    Returns:
+        dict: {"facets": {facet: [{"value", "count"}, ...]}, "top": [...],
+        "total": int}
+    """
+    counts = {facet: Counter() for facet in FACET_FIELDS.values()}
+    total = 0
+
+    def scored_companies():
+        nonlocal total
+        for company in companies:
+            total += 1
+            for field, facet in FACET_FIELDS.items():
+                counts[facet].update(facet_values(company, field))
+            if isinstance(company.get("score"), (int, float)):
+                yield company
+
+    # nlargest keeps only k companies, so a cursor can be passed in directly
+    best = heapq.nlargest(
+        k,
+        scored_companies(),
+        key=lambda company: (company["score"], str(company["_id"])),
+    )
+    top = [top_entry(company) for company in best]
+    return {
+        "facets": {facet: facet_counts(counter) for facet, counter in counts.items()},
+        "top": top,
+        "total": total,
+    }
+
+
+def refresh_company_stats(stats_collection, companies, k=TOP_K_MAX):
+    """
+    Recomputes and stores the stats document. Call after writing scores so
+    facet and leaderboard reads see them.
+
+    Returns:
+        dict: The stored document
+    """
+    document = compute_company_stats(companies, k)
+    document["updated_at"] = datetime.now(timezone.utc)
+    stats_collection.replace_one({"_id": COMPANY_STATS_ID}, document, upsert=True)
+    return document
+
+
+def refresh_snapshot_facets(stats_collection, snapshot):
+    """
+    Recomputes the facet counts from a columnar.Snapshot, leaving the stored
+    leaderboard to refresh_top since snapshots do not carry company names.
+
+    Returns:
+        dict: The facet counts
+    """
+    facets = {
+        facet: facet_counts(snapshot.value_counts(field))
+        for field, facet in FACET_FIELDS.items()
+    }
+    stats_collection.update_one(
+        {"_id": COMPANY_STATS_ID},
+        {
+            "$set": {
+                "facets": facets,
+                "total": snapshot.count,
+                "updated_at": datetime.now(timezone.utc),
+            },
+            "$setOnInsert": {"top": []},
+        },
+        upsert=True,
+    )
+    return facets
+
+
+def refresh_top(stats_collection, companies_collection, k=TOP_K_MAX):
+    """
+    Rebuilds the stored leaderboard from the k best scored companies, read
+    through the score index instead of scanning the collection. Call after
+    writing scores without a full refresh_company_stats.
+
+    Returns:
+        list: The stored leaderboard
+    """
+    cursor = (
+        companies_collection.find(
+            {"score": {"$type": "number"}}, {field: 1 for field in TOP_FIELDS}
+        )
+        .sort([("score", -1), ("_id", -1)])
+        .limit(k)
+    )
+    top = [top_entry(company) for company in cursor]
+    stats_collection.update_one(
+        {"_id": COMPANY_STATS_ID},
+        {"$set": {"top": top, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    return top
+
+
+def stats_projection(k=None):
+    """
+    Projection of the stats document for a facets read (k None) or a top-k
+    read, so only the requested part of the document leaves the database.
+    """
+    if k is None:
+        return {"top": 0}
+    return {"top": {"$slice": k}, "updated_at": 1}
+
+
+def parse_k(k):
+    k = int(k)
+    if not 1 <= k <= TOP_K_MAX:
+        raise ValueError(f"k must be between 1 and {TOP_K_MAX}")
+    return k
+
+
+if __name__ == "__main__":
+    # Rebuild the stats from the startups collection, e.g. after a manual import
+    load_dotenv()
+    db = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))[
+        "startup_database"
+    ]
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else TOP_K_MAX
+    stats = refresh_company_stats(
+        db["company_stats"], db["startups"].find({}, STATS_PROJECTION), k
+    )
+    print(f"Refreshed company stats for {stats['total']} companies")
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import random
+
+from metrics import get_logger
+
+# Number of Gemini requests allowed in flight at once
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "8"))
+# Attempts per record before giving up and keeping the original record
+ENRICH_RETRIES = int(os.getenv("ENRICH_RETRIES", "3"))
+# Base delay (seconds) for exponential backoff between attempts
+ENRICH_BACKOFF = float(os.getenv("ENRICH_BACKOFF", "1.0"))
+
+log = get_logger("enrichment")
+
+
+async def _with_retry(fill, record, retries, backoff):
+    # Always make one attempt, even when retries is 0 or negative
+    retries = max(1, retries)
+    for attempt in range(1, retries + 1):
+        try:
+            return await fill(record)
+        except Exception as e:
+            if attempt == retries:
+                log.error("enrich_failed", record_id=record.get("_id"), error=str(e))
+                return record
+            # Exponential backoff with full jitter
+            delay = backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+            log.warning(
+                "enrich_retry",
+                record_id=record.get("_id"),
+                attempt=attempt,
+                retries=retries,
+                delay=round(delay, 1),
+                error=str(e),
+            )
+            await asyncio.sleep(delay)
+
+
+async def enrich_all(
+    records,
+    fill,
+    concurrency=ENRICH_CONCURRENCY,
+    retries=ENRICH_RETRIES,
+    backoff=ENRICH_BACKOFF,
+    on_complete=None,
+):
+    """
+    Run the async `fill` coroutine over every record with at most `concurrency`
+    calls in flight, retrying failed records with exponential backoff.
+
+    Args:
+        records (list): Startup dictionaries to enrich
+        fill (callable): Async function taking a record and returning the enriched record
+        concurrency (int): Maximum number of concurrent calls
+        retries (int): Attempts per record before keeping the original record
+        backoff (float): Base delay in seconds between attempts
+        on_complete (callable): Called with the number of finished records after each one
+
+    Returns:
+        list: Enriched records in the same order as `records`
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    completed = 0
+
+    async def run(record):
+        nonlocal completed
+        async with semaphore:
+            result = await _with_retry(fill, record, retries, backoff)
+        completed += 1
+        if on_complete is not None:
+            on_complete(completed)
+        return result
+
+    return await asyncio.gather(*(run(record) for record in records))
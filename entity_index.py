@@ -0,0 +1,232 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+
+ENTITY_INDEX_PATH = os.getenv("ENTITY_INDEX_PATH", ".entity_index.sqlite")
+
+# Legal suffixes dropped from company names before comparing them
+COMPANY_SUFFIXES = {
+    "inc",
+    "incorporated",
+    "llc",
+    "ltd",
+    "limited",
+    "corp",
+    "corporation",
+    "co",
+    "company",
+    "gmbh",
+    "plc",
+    "pbc",
+}
+# Placeholder company names that say nothing about which startup it is
+GENERIC_COMPANY_NAMES = {
+    "",
+    "unknown company",
+    "stealth",
+    "stealth startup",
+    "stealth mode startup",
+    "self employed",
+    "freelance",
+    "confidential",
+}
+
+
+def _ascii_words(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    text = text.encode("ascii", "ignore").decode().lower()
+    return re.sub(r"[^a-z0-9]+", " ", text).split()
+
+
+def normalize_company_name(name):
+    words = _ascii_words(name)
+    if words and words[0] == "the":
+        words = words[1:]
+    while words and words[-1] in COMPANY_SUFFIXES:
+        words = words[:-1]
+    return " ".join(words)
+
+
+def normalize_person_name(name):
+    return " ".join(_ascii_words(name))
+
+
+def normalize_linkedin_url(url):
+    url = (url or "").strip().lower()
+    url = re.sub(r"^https?://", "", url)
+    url = re.sub(r"^[a-z]{2,3}\.linkedin\.com", "linkedin.com", url)
+    url = re.sub(r"^www\.", "", url)
+    return url.split("?")[0].split("#")[0].rstrip("/")
+
+
+def blocking_keys(record):
+    """
+    Returns the keys identifying the startup behind a founder record: each
+    founder's LinkedIn URL and name paired with the company. A company name
+    is never a key on its own, since unrelated startups share names, and
+    generic company names only pair with LinkedIn URLs.
+    """
+    company = normalize_company_name(record.get("Name"))
+    specific = company not in GENERIC_COMPANY_NAMES
+
+    keys = []
+    founders = dict(record.get("Founder_LinkedIn") or {})
+    for name in (record.get("Founders") or "").split(","):
+        founders.setdefault(name.strip(), "")
+    for name, url in founders.items():
+        url = normalize_linkedin_url(url)
+        person = normalize_person_name(name)
+        if url:
+            keys.append(f"linkedin:{url}|company:{company}")
+        if person and specific:
+            keys.append(f"founder:{person}|company:{company}")
+    return keys
+
+
+def merge_founders(record, other):
+    """
+    Adds the founders of other that record does not list yet.
+    """
+    names = [name.strip() for name in (record.get("Founders") or "").split(",")]
+    names = [name for name in names if name]
+    linkedin = record.setdefault("Founder_LinkedIn", {}) or {}
+    for name in (other.get("Founders") or "").split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    for name, url in (other.get("Founder_LinkedIn") or {}).items():
+        linkedin.setdefault(name, url)
+    record["Founders"] = ", ".join(names)
+    record["Founder_LinkedIn"] = linkedin
+    return record
+
+
+class EntityIndex:
+    """
+    Persistent index from blocking keys to known startups, used to drop
+    duplicate founder records before they are enriched.
+    Pass ":memory:" as path to deduplicate within one run only.
+    """
+
+    def __init__(self, path=ENTITY_INDEX_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entities (
+                entity_id TEXT PRIMARY KEY,
+                name TEXT,
+                founders TEXT NOT NULL
+            )
+            """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entity_keys (
+                key TEXT PRIMARY KEY,
+                entity_id TEXT NOT NULL
+            )
+            """)
+        self._conn.commit()
+
+    def lookup(self, keys):
+        for key in keys:
+            row = self._conn.execute(
+                "SELECT entity_id FROM entity_keys WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                return row[0]
+        return None
+
+    def _add_keys(self, entity_id, keys):
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO entity_keys VALUES (?, ?)",
+            [(key, entity_id) for key in keys],
+        )
+
+    def _merge_known(self, entity_id, record):
+        row = self._conn.execute(
+            "SELECT founders FROM entities WHERE entity_id = ?", (entity_id,)
+        ).fetchone()
+        founders = json.loads(row[0]) if row else {}
+        founders.update(record.get("Founder_LinkedIn") or {})
+        self._conn.execute(
+            "UPDATE entities SET founders = ? WHERE entity_id = ?",
+            (json.dumps(founders), entity_id),
+        )
+
+    def resolve(self, records):
+        """
+        Splits records into new startups and duplicates without changing the
+        index. Duplicates within the batch are merged into the first record
+        of their startup; duplicates of startups committed by earlier runs
+        are skipped. Pass the unique records to commit() once they are saved.
+
+        Args:
+            records (iterable): Founder records with "_id", "Name" and founder fields
+
+        Returns:
+            tuple: (list of unique new records, dict of counters including
+            llm_calls_avoided)
+        """
+        unique = []
+        in_batch = {}
+        stats = {"records": 0, "new": 0, "merged": 0, "skipped": 0}
+
+        with self._lock:
+            for record in records:
+                stats["records"] += 1
+                keys = blocking_keys(record)
+                if not keys:
+                    # Nothing to match on, treat the record as a new startup
+                    unique.append(record)
+                    stats["new"] += 1
+                    continue
+
+                if self.lookup(keys) is not None:
+                    stats["skipped"] += 1
+                    continue
+                first = next((in_batch[key] for key in keys if key in in_batch), None)
+                if first is None:
+                    first = record
+                    unique.append(record)
+                    stats["new"] += 1
+                else:
+                    merge_founders(first, record)
+                    stats["merged"] += 1
+                for key in keys:
+                    in_batch.setdefault(key, first)
+
+        stats["llm_calls_avoided"] = stats["merged"] + stats["skipped"]
+        return unique, stats
+
+    def commit(self, records):
+        """
+        Records the startups behind saved records, so later runs skip them.
+        Call it with the records resolve() returned, after they are saved, so
+        a failed enrichment or save leaves them to be ingested again.
+
+        Args:
+            records (iterable): Founder records returned by resolve()
+        """
+        with self._lock:
+            for record in records:
+                keys = blocking_keys(record)
+                if not keys:
+                    continue
+                entity_id = self.lookup(keys)
+                if entity_id is None:
+                    entity_id = str(record.get("_id") or keys[0])
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO entities VALUES (?, ?, ?)",
+                        (
+                            entity_id,
+                            record.get("Name"),
+                            json.dumps(record.get("Founder_LinkedIn") or {}),
+                        ),
+                    )
+                else:
+                    # Another run saved the same startup in the meantime
+                    self._merge_known(entity_id, record)
+                self._add_keys(entity_id, keys)
+            self._conn.commit()
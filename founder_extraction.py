@@ -0,0 +1,70 @@
+import re
+
+# "Co-Founder" contains "Founder", so one pattern covers both titles
+FOUNDER_TITLE = re.compile("Founder")
+
+
+def founder_experience(result):
+    """
+    Returns the first experience entry with a founder title, or None.
+    """
+    for exp in result.get("experience") or ():
+        title = exp.get("title")
+        if title and FOUNDER_TITLE.search(title):
+            return exp
+    return None
+
+
+def founder_record(result):
+    """
+    Builds a startup-like entry for a Linkd profile with founder experience,
+    or returns None when the profile has none.
+    """
+    experience = founder_experience(result)
+    if experience is None:
+        return None
+
+    profile = result["profile"]
+    return {
+        "_id": str(profile.get("id", "")),
+        "Name": experience.get("company_name", "Unknown Company"),
+        "Description": profile.get("headline", ""),
+        "Founders": profile.get("name", ""),
+        "Founder_LinkedIn": {profile.get("name", ""): profile.get("linkedin_url", "")},
+        "Launch Date": (
+            experience.get("start_date", "").split("T")[0]
+            if experience.get("start_date")
+            else ""
+        ),
+        "Website": None,
+        "Industry": [],
+        "Early Metrics": "",
+        "Funding Status": "",
+        "Location": experience.get("location", profile.get("location", "")),
+        "Press": "",
+        "score": 0,
+        "funding": 0,
+        "stage": "",
+    }
+
+
+def extract_founders(results):
+    """
+    Yields a startup record for every founder profile in any iterable of
+    Linkd results, one profile at a time.
+    """
+    for result in results:
+        record = founder_record(result)
+        if record is not None:
+            yield record
+
+
+async def aextract_founders(results):
+    """
+    Async variant of extract_founders for paginated streams such as
+    LinkdClient.iter_profiles.
+    """
+    async for result in results:
+        record = founder_record(result)
+        if record is not None:
+            yield record
@@ -0,0 +1,88 @@
+"""
+Rate-limited, metered Gemini requests shared by enrichment and scoring.
+
+Every request waits for room in the Gemini quota shared by all processes,
+reserving the prompt tokens plus GEMINI_OUTPUT_TOKENS per expected answer,
+records its token usage and cost, corrects the reservation with the real
+usage and logs one gemini_call line.
+"""
+
+import asyncio
+import json
+import time
+
+from metrics import get_logger, record_gemini_usage, track_call
+from prompts import count_tokens
+from rate_limit import GEMINI_OUTPUT_TOKENS, gemini_limiter
+
+GEMINI_MODEL = "gemini-2.5-flash-preview-04-17"
+
+log = get_logger("gemini")
+
+
+def _config(schema):
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+
+def _finish(operation, prompt, prompt_tokens, start, response, log_fields):
+    usage = record_gemini_usage(GEMINI_MODEL, operation, response)
+    log.info(
+        "gemini_call",
+        operation=operation,
+        **log_fields,
+        seconds=round(time.perf_counter() - start, 3),
+        prompt_chars=len(prompt),
+        prompt_tokens=prompt_tokens,
+        **usage,
+    )
+    return usage
+
+
+def call_gemini(client, operation, prompt, schema, reserve_outputs=1, **log_fields):
+    """
+    Sends prompt to Gemini once the quota allows it and returns the parsed
+    JSON answer.
+
+    Args:
+        client (genai.Client): Gemini client
+        operation (str): Operation name for metrics and logs
+        prompt (str): Prompt text
+        schema: Response schema of the JSON answer
+        reserve_outputs (int): Answers the prompt asks for, each reserving
+            GEMINI_OUTPUT_TOKENS of the token quota
+        **log_fields: Extra fields of the gemini_call log line
+
+    Returns:
+        The parsed JSON answer
+    """
+    prompt_tokens = count_tokens(prompt)
+    reserved = prompt_tokens + GEMINI_OUTPUT_TOKENS * reserve_outputs
+    gemini_limiter.acquire(reserved)
+    start = time.perf_counter()
+    with track_call("gemini", operation):
+        response = client.models.generate_content(
+            model=GEMINI_MODEL, contents=prompt, config=_config(schema)
+        )
+    usage = _finish(operation, prompt, prompt_tokens, start, response, log_fields)
+    gemini_limiter.settle(reserved, usage["total"])
+    return json.loads(response.text)
+
+
+async def acall_gemini(
+    client, operation, prompt, schema, reserve_outputs=1, **log_fields
+):
+    """
+    call_gemini for event loops: awaits the quota and the asynchronous client,
+    and keeps the SQLite quota updates off the loop.
+    """
+    prompt_tokens = count_tokens(prompt)
+    reserved = prompt_tokens + GEMINI_OUTPUT_TOKENS * reserve_outputs
+    await gemini_limiter.aacquire(reserved)
+    start = time.perf_counter()
+    with track_call("gemini", operation):
+        response = await client.aio.models.generate_content(
+            model=GEMINI_MODEL, contents=prompt, config=_config(schema)
+        )
+    usage = _finish(operation, prompt, prompt_tokens, start, response, log_fields)
+    await asyncio.to_thread(gemini_limiter.settle, reserved, usage["total"])
+    return json.loads(response.text)
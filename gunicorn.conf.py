@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for serving app.py in production:
+
+    gunicorn app:app
+
+Gunicorn reads this file from the working directory. Every worker imports
+the app itself and creates its own MongoDB and Gemini clients on first use
+(see clients.py). Each worker serves GUNICORN_THREADS requests at once, so
+keep MONGO_POOL_SIZE at or above it.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2 + 1)))
+# "gthread" serves requests from a thread pool in each worker, "sync" one at a time
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+# Importing the app in the master shares its modules with the workers, but
+# also the SQLite connections and locks the app opens at import time, so it
+# is off unless asked for
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+accesslog = "-"
+
+
+def post_worker_init(worker):
+    # Start the index bootstrap and job threads before the first request
+    from app import background_work
+
+    background_work.get()
@@ -0,0 +1,143 @@
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from pymongo.errors import OperationFailure
+
+from company_query import build_company_query, parse_sort, sort_spec
+from metrics import get_logger
+
+log = get_logger("indexes")
+
+# Server codes for an existing index of the same name with other keys
+INDEX_CONFLICT_CODES = {85, 86}
+
+# Compound indexes for the filter shapes built by build_company_query.
+# Equality fields come first, then the sort field, then range fields, so a
+# filtered and sorted /api/companies page is answered from a single index.
+# Sorted indexes end in _id, the tie breaker of sort_spec and keyset cursors.
+COMPANY_INDEXES = {
+    "industry_score": [("Industry", 1), ("score", -1), ("_id", -1)],
+    "industry_funding": [("Industry", 1), ("funding", -1), ("_id", -1)],
+    "location_score": [("Location", 1), ("score", -1), ("_id", -1)],
+    "stage_score": [("stage", 1), ("score", -1), ("_id", -1)],
+    "stage_location_funding": [
+        ("stage", 1),
+        ("Location", 1),
+        ("funding", -1),
+        ("_id", -1),
+    ],
+    "score": [("score", -1), ("_id", -1)],
+    "funding": [("funding", -1), ("_id", -1)],
+    # Bucket rewrites of score_index, update_many by raw_score and score
+    "raw_score": [("raw_score", 1), ("score", 1)],
+}
+
+
+def ensure_indexes(collection):
+    """
+    Creates the /api/companies indexes on collection. Existing indexes are
+    left as is, unless their keys changed, then they are rebuilt.
+
+    Returns:
+        list: Names of the indexes
+    """
+    names = []
+    for name, keys in COMPANY_INDEXES.items():
+        try:
+            names.append(collection.create_index(keys, name=name))
+        except OperationFailure as e:
+            if e.code not in INDEX_CONFLICT_CODES:
+                raise
+            log.info("index_rebuilt", collection=collection.name, index=name)
+            collection.drop_index(name)
+            names.append(collection.create_index(keys, name=name))
+    log.info("indexes_ensured", collection=collection.name, indexes=len(names))
+    return names
+
+
+def plan_stages(plan):
+    """
+    Flattens a query plan tree into a list of (stage, index name) pairs, root first.
+    """
+    stages = [(plan.get("stage"), plan.get("indexName"))]
+    children = plan.get("inputStages") or (
+        [plan["inputStage"]] if "inputStage" in plan else []
+    )
+    for child in children:
+        stages.extend(plan_stages(child))
+    return stages
+
+
+def explain_command(collection_name, filters):
+    """
+    Builds the explain command for the query /api/companies would run for a
+    request body, returning the command and the query filter.
+    """
+    filters = dict(filters)
+    sort_field, direction = parse_sort(
+        filters.pop("sort", None), filters.pop("order", None)
+    )
+    for name in ("limit", "cursor", "fields", "format"):
+        filters.pop(name, None)
+    query = build_company_query(filters)
+
+    command = {
+        "explain": {
+            "find": collection_name,
+            "filter": query,
+            "sort": dict(sort_spec(sort_field, direction)),
+        },
+        "verbosity": "executionStats",
+    }
+    return command, query
+
+
+def summarize_explanation(explanation, query):
+    winning_plan = explanation["queryPlanner"]["winningPlan"]
+    # Sharded and slot-based engine plans nest the classic plan one level down
+    winning_plan = winning_plan.get("queryPlan", winning_plan)
+    stages = plan_stages(winning_plan)
+    stats = explanation.get("executionStats", {})
+
+    return {
+        "query": query,
+        "stages": [stage for stage, _ in stages],
+        "indexes": [index for _, index in stages if index],
+        "collscan": any(stage == "COLLSCAN" for stage, _ in stages),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_time_ms": stats.get("executionTimeMillis"),
+    }
+
+
+def explain_companies_query(collection, filters):
+    """
+    Explains the query /api/companies would run for a request body.
+
+    Args:
+        collection: The startups collection
+        filters (dict): Request body, including optional sort and order
+
+    Returns:
+        dict: Winning plan stages, indexes used, documents and keys examined,
+        and whether the plan falls back to a collection scan
+    """
+    command, query = explain_command(collection.name, filters)
+    return summarize_explanation(collection.database.command(command), query)
+
+
+# Create the indexes, and optionally explain a filter body given as JSON:
+#   python indexes.py '{"stage": "Seed", "sort": "score"}'
+if __name__ == "__main__":
+    load_dotenv()
+    client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    companies_collection = client["startup_database"]["startups"]
+
+    ensure_indexes(companies_collection)
+    if len(sys.argv) > 1:
+        report = explain_companies_query(companies_collection, json.loads(sys.argv[1]))
+        print(json.dumps(report, indent=2, default=str))
@@ -0,0 +1,209 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING, ReturnDocument
+
+from metrics import get_logger
+
+# Worker threads started per process, 0 disables job execution in this process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds an idle worker waits before polling for queued jobs again
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+# Seconds a running job may go without a heartbeat before another worker
+# reclaims it, as when the process that claimed it died
+JOB_LEASE = float(os.getenv("JOB_LEASE", "300"))
+
+log = get_logger("jobs")
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+def new_job(params):
+    """
+    Returns the document of a queued job. Producers that do not own a
+    JobQueue, such as the ASGI app, insert it directly.
+    """
+    now = utcnow()
+    return {
+        "_id": uuid.uuid4().hex,
+        "status": "queued",
+        "params": params,
+        "progress": {},
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class JobQueue:
+    """
+    Job queue persisted in a MongoDB collection. Any process running workers
+    on the same collection can pick up a queued job; claiming is atomic, so
+    each job runs once at a time. A running job holds a lease that its
+    worker renews every lease / 3 seconds; a job whose lease ran out is
+    claimed again, so jobs of a crashed process are not stuck running.
+
+    Args:
+        collection: Collection storing the jobs
+        handler (callable): handler(params, report) runs a job and returns its
+            result dict, calling report(**counters) to publish progress
+        workers (int): Number of worker threads started by start()
+        poll_interval (float): Seconds between polls when the queue is empty
+        lease (float): Seconds without a heartbeat before a running job is
+            claimed again
+    """
+
+    def __init__(
+        self,
+        collection,
+        handler,
+        workers=JOB_WORKERS,
+        poll_interval=JOB_POLL_INTERVAL,
+        lease=JOB_LEASE,
+    ):
+        self.collection = collection
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = threading.Event()
+        self._threads = []
+
+    def ensure_indexes(self):
+        self.collection.create_index(
+            [("status", ASCENDING), ("created_at", ASCENDING)], name="status_created"
+        )
+
+    def enqueue(self, params):
+        """
+        Queues a job and returns its id.
+        """
+        job = new_job(params)
+        self.collection.insert_one(job)
+        self._wakeup.set()
+        return job["_id"]
+
+    def get(self, job_id):
+        return self.collection.find_one({"_id": job_id})
+
+    def claim(self):
+        """
+        Atomically moves the oldest queued job, or running job whose lease
+        expired, to running and returns it, or None.
+        """
+        now = utcnow()
+        job = self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "queued"},
+                    {
+                        "status": "running",
+                        "updated_at": {"$lt": now - timedelta(seconds=self.lease)},
+                    },
+                ]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "worker": self.worker_id,
+                    "claim_id": uuid.uuid4().hex,
+                    "started_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if job is not None and job["attempts"] > 1:
+            log.warning("job_reclaimed", job_id=job["_id"], attempts=job["attempts"])
+        return job
+
+    def _update(self, job, update):
+        """
+        Applies update to job while this claim still holds it, so a worker
+        whose lease was taken over does not overwrite the new run.
+        """
+        update["updated_at"] = utcnow()
+        self.collection.update_one(
+            {"_id": job["_id"], "claim_id": job["claim_id"]}, {"$set": update}
+        )
+
+    def _heartbeat(self, job, stop):
+        while not stop.wait(self.lease / 3):
+            try:
+                self._update(job, {})
+            except Exception as e:
+                log.error("job_heartbeat_failed", job_id=job["_id"], error=str(e))
+
+    def run(self, job):
+        def report(**counters):
+            self._update(
+                job, {f"progress.{key}": value for key, value in counters.items()}
+            )
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job, stop), daemon=True
+        )
+        heartbeat.start()
+        try:
+            result = self.handler(job["params"], report)
+            update = {"status": "done", "result": result}
+        except Exception as e:
+            log.exception("job_failed", job_id=job["_id"], error=str(e))
+            update = {"status": "failed", "error": str(e)}
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        update["finished_at"] = utcnow()
+        self._update(job, update)
+
+    def _work(self):
+        while True:
+            try:
+                job = self.claim()
+            except Exception as e:
+                log.error("job_claim_failed", error=str(e))
+                job = None
+
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self.run(job)
+
+    def start(self):
+        """
+        Starts the worker threads. Safe to call more than once.
+        """
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"job-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def wait(self, job_id, timeout=None):
+        """
+        Blocks until the job finishes and returns it. Meant for scripts and benchmarks.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in ("done", "failed"):
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                return job
+            time.sleep(0.1)
@@ -1,27 +1,201 @@
+import asyncio
 import json
 import os
-from typing import Any, Dict, Optional
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from metrics import get_logger, track_call
+from rate_limit import linkd_limiter
 
 load_dotenv()  # Load environment variables from .env file
 
+LINKD_SEARCH_URL = os.getenv(
+    "LINKD_SEARCH_URL", "https://search.linkd.inc/api/search/users"
+)
+LINKD_CONNECT_TIMEOUT = float(os.getenv("LINKD_CONNECT_TIMEOUT", "5"))
+LINKD_READ_TIMEOUT = float(os.getenv("LINKD_READ_TIMEOUT", "30"))
+LINKD_RETRIES = int(os.getenv("LINKD_RETRIES", "4"))
+LINKD_BACKOFF = float(os.getenv("LINKD_BACKOFF", "1.0"))
+LINKD_POOL_SIZE = int(os.getenv("LINKD_POOL_SIZE", "10"))
+# Linkd returns at most 30 profiles per request
+LINKD_PAGE_SIZE = int(os.getenv("LINKD_PAGE_SIZE", "30"))
 
-def search_users(
-    query: str,
-) -> Dict[str, Any]:
-    url = "https://search.linkd.inc/api/search/users"
-    token = os.getenv("LINKD_API_KEY")
-    headers = {"Authorization": f"Bearer {token}"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+log = get_logger("linkd")
+
+
+class LinkdClient:
+    """
+    Linkd search API client sharing one keep-alive connection pool.
+    Requests that hit 429 or 5xx responses, or fail to connect, are retried
+    with jittered exponential backoff, honouring Retry-After when present.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        url: str = LINKD_SEARCH_URL,
+        timeout=(LINKD_CONNECT_TIMEOUT, LINKD_READ_TIMEOUT),
+        retries: int = LINKD_RETRIES,
+        backoff: float = LINKD_BACKOFF,
+        pool_size: int = LINKD_POOL_SIZE,
+        page_size: int = LINKD_PAGE_SIZE,
+        limiter=linkd_limiter,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.page_size = page_size
+        self.limiter = limiter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        token = token or os.getenv("LINKD_API_KEY")
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2**attempt) * random.uniform(0.5, 1.5)
+
+    def search(
+        self,
+        query: str,
+        school=("UCLA",),
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Fetches one page of search results.
+        """
+        params = {
+            "query": query,
+            "school": list(school),
+            "limit": limit or self.page_size,
+            "offset": offset,
+        }
+        for attempt in range(self.retries + 1):
+            # Every attempt, retries included, counts against the shared quota
+            self.limiter.acquire()
+            try:
+                with track_call("linkd", "search"):
+                    response = self.session.get(
+                        self.url, params=params, timeout=self.timeout
+                    )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                log.warning(
+                    "linkd_retry", offset=offset, error=str(e), delay=round(delay, 1)
+                )
+            else:
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt == self.retries
+                ):
+                    response.raise_for_status()
+                    return response.json()
+                delay = self._retry_delay(attempt, response)
+                log.warning(
+                    "linkd_retry",
+                    offset=offset,
+                    status=response.status_code,
+                    delay=round(delay, 1),
+                )
+            time.sleep(delay)
+
+    async def iter_pages(
+        self,
+        query: str,
+        school=("UCLA",),
+        prefetch: int = 2,
+        max_results: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Walks every result page of a search, keeping up to `prefetch` page
+        requests in flight ahead of the consumer.
+
+        Args:
+            query (str): Search query
+            school (tuple): Schools to filter by
+            prefetch (int): Number of pages fetched ahead of the current one
+            max_results (int): Stop after this many results, default all
 
-    # Base parameters
-    params = {"query": query, "school": ["UCLA"]}
+        Yields:
+            dict: Raw page responses with "results" and "total"
+        """
+        first_page = await asyncio.to_thread(self.search, query, school)
+        yield first_page
 
-    # Add any additional parameters
+        total = first_page.get("total", len(first_page.get("results", [])))
+        if max_results is not None:
+            total = min(total, max_results)
+        offsets = iter(range(self.page_size, total, self.page_size))
 
-    response = requests.request("GET", url, headers=headers, params=params)
-    return response.json()
+        pending = []
+
+        def schedule():
+            for offset in offsets:
+                pending.append(
+                    asyncio.ensure_future(
+                        asyncio.to_thread(self.search, query, school, None, offset)
+                    )
+                )
+                if len(pending) >= max(1, prefetch):
+                    break
+
+        schedule()
+        try:
+            while pending:
+                page = await pending.pop(0)
+                schedule()
+                if not page.get("results"):
+                    break
+                yield page
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def iter_profiles(
+        self, query: str, school=("UCLA",), prefetch: int = 2, max_results=None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields the individual profiles of every result page.
+        """
+        async for page in self.iter_pages(query, school, prefetch, max_results):
+            for result in page.get("results", []):
+                yield result
+
+
+_client: Optional[LinkdClient] = None
+
+
+def get_linkd_client() -> LinkdClient:
+    """
+    Returns the process-wide Linkd client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        _client = LinkdClient()
+    return _client
+
+
+def search_users(
+    query: str,
+) -> Dict[str, Any]:
+    return get_linkd_client().search(query)
 
 
 # Example usage
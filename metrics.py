@@ -0,0 +1,300 @@
+"""
+Process-wide instrumentation: Prometheus-style counters and latency
+histograms for external calls, and structured JSON logging.
+
+Metrics are kept per process; under several server workers each worker
+exposes its own /metrics.
+"""
+
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# USD per million tokens, by model and token kind
+GEMINI_PRICING = {
+    "gemini-2.5-flash-preview-04-17": {"input": 0.15, "output": 0.60, "thinking": 3.50},
+}
+DEFAULT_GEMINI_PRICING = GEMINI_PRICING["gemini-2.5-flash-preview-04-17"]
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {sorted(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    return (
+        "{"
+        + ",".join(
+            '{}="{}"'.format(
+                name,
+                value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+            )
+            for name, value in pairs
+        )
+        + "}"
+    )
+
+
+class Counter:
+    """
+    Monotonic counter with labels, e.g. tokens or dollars spent.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name + _format_labels(self.labelnames, key), value
+
+
+class Histogram:
+    """
+    Histogram with labels, exported with cumulative Prometheus bucket semantics.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            # One count per bucket plus a final overflow count for +Inf
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        counts, _ = self._values.get(_label_key(self.labelnames, labels), ([], 0))
+        return sum(counts)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(
+                (key, (list(counts), total))
+                for key, (counts, total) in self._values.items()
+            )
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = _format_labels(self.labelnames, key, [("le", le)])
+                yield f"{self.name}_bucket{labels}", cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels}", total
+            yield f"{self.name}_count{labels}", cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(f"{sample} {value}" for sample, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+EXTERNAL_CALL_SECONDS = registry.register(
+    Histogram(
+        "external_call_seconds",
+        "Latency of calls to Gemini and Linkd",
+        ("service", "operation", "outcome"),
+    )
+)
+GEMINI_TOKENS = registry.register(
+    Counter(
+        "gemini_tokens_total",
+        "Gemini tokens reported in response usage metadata",
+        ("model", "operation", "kind"),
+    )
+)
+GEMINI_COST_USD = registry.register(
+    Counter(
+        "gemini_cost_usd_total",
+        "Estimated Gemini spend from token counts and GEMINI_PRICING",
+        ("model", "operation"),
+    )
+)
+MONGO_QUERY_SECONDS = registry.register(
+    Histogram(
+        "mongo_query_seconds",
+        "Latency of MongoDB queries, including fetching their results",
+        ("collection", "operation"),
+    )
+)
+HTTP_REQUEST_SECONDS = registry.register(
+    Histogram(
+        "http_request_seconds",
+        "Time to produce the response of API requests, before streaming the body",
+        ("method", "endpoint", "status"),
+    )
+)
+
+
+@contextmanager
+def track_call(service, operation):
+    """
+    Times the enclosed call to an external service, labelled ok or error.
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_SECONDS.observe(
+            time.perf_counter() - start,
+            service=service,
+            operation=operation,
+            outcome=outcome,
+        )
+
+
+@contextmanager
+def track_query(collection, operation):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        MONGO_QUERY_SECONDS.observe(
+            time.perf_counter() - start, collection=collection, operation=operation
+        )
+
+
+def timed_cursor(cursor, collection, operation):
+    """
+    Iterates a MongoDB cursor, recording the time spent fetching from it once
+    it is exhausted or closed. Time spent by the consumer is not counted.
+    """
+    elapsed = 0
+    iterator = iter(cursor)
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                document = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += time.perf_counter() - start
+            yield document
+    finally:
+        MONGO_QUERY_SECONDS.observe(elapsed, collection=collection, operation=operation)
+
+
+def record_gemini_usage(model, operation, response):
+    """
+    Counts the tokens in a Gemini response's usage metadata and their estimated
+    cost. Returns the usage as a dict of token counts and cost_usd.
+    """
+    metadata = getattr(response, "usage_metadata", None)
+    usage = {
+        "input": getattr(metadata, "prompt_token_count", None) or 0,
+        "output": getattr(metadata, "candidates_token_count", None) or 0,
+        "thinking": getattr(metadata, "thoughts_token_count", None) or 0,
+    }
+    pricing = GEMINI_PRICING.get(model, DEFAULT_GEMINI_PRICING)
+    cost = sum(usage[kind] * pricing[kind] for kind in usage) / 1_000_000
+
+    for kind, tokens in usage.items():
+        GEMINI_TOKENS.inc(tokens, model=model, operation=operation, kind=kind)
+    GEMINI_COST_USD.inc(cost, model=model, operation=operation)
+    usage["total"] = usage["input"] + usage["output"] + usage["thinking"]
+    usage["cost_usd"] = round(cost, 8)
+    return usage
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            payload["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class EventLogger(logging.LoggerAdapter):
+    """
+    Logger taking an event name and keyword fields, e.g.
+    log.info("linkd_retry", status=503, delay=1.2).
+    """
+
+    def process(self, msg, kwargs):
+        reserved = {"exc_info", "stack_info", "stacklevel", "extra"}
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in reserved}
+        kwargs["extra"] = {"fields": fields}
+        return msg, kwargs
+
+
+_root_logger = logging.getLogger("startups")
+if not _root_logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(JSONFormatter())
+    _root_logger.addHandler(_handler)
+    _root_logger.setLevel(LOG_LEVEL)
+    _root_logger.propagate = False
+
+
+def get_logger(name):
+    """
+    Returns the structured JSON logger for a module.
+    """
+    return EventLogger(_root_logger.getChild(name), {})
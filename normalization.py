@@ -0,0 +1,134 @@
+import numpy as np
+
+
+def average_ranks(scores):
+    """
+    Returns the 0-based rank of every score, with tied scores sharing the
+    average of the positions they occupy. Runs in O(n log n).
+
+    Args:
+        scores (array-like): Raw scores
+
+    Returns:
+        numpy.ndarray: Float ranks aligned with scores
+    """
+    scores = np.asarray(scores, dtype=float)
+    order = np.argsort(scores, kind="stable")
+    # First position and size of every run of equal scores in sorted order
+    _, first, counts = np.unique(scores[order], return_index=True, return_counts=True)
+    ranks = np.empty(len(scores))
+    ranks[order] = np.repeat(first + (counts - 1) / 2, counts)
+    return ranks
+
+
+def percentile_scores(scores):
+    """
+    Maps raw scores to the 0-100 percentile scale used by the scoring job,
+    spreading the middle of the distribution with the same power curve as
+    normalize_scores_with_percentile.
+
+    Args:
+        scores (array-like): Raw scores
+
+    Returns:
+        numpy.ndarray: Normalized integer-valued scores aligned with scores
+    """
+    scores = np.asarray(scores, dtype=float)
+    if len(scores) == 0:
+        return np.empty(0)
+    if len(scores) == 1:
+        percentile = np.full(1, 50.0)
+    else:
+        percentile = average_ranks(scores) / (len(scores) - 1) * 100
+    return spread_percentiles(percentile)
+
+
+def spread_percentiles(percentile):
+    """
+    Sigmoid-like transformation of 0-100 percentiles that spreads out the
+    middle values, leaving fewer companies clustered at the extremes.
+
+    Args:
+        percentile (float | array-like): Percentiles
+
+    Returns:
+        numpy.ndarray: Rounded scores, 0-dimensional for a single percentile
+    """
+    percentile = np.asarray(percentile, dtype=float)
+    lower = 25 * (np.minimum(percentile, 50) / 50) ** 0.8
+    upper = 75 + 25 * (np.maximum(percentile - 50, 0) / 50) ** 1.2
+    return np.round(np.where(percentile < 50, lower, upper))
+
+
+def z_score_scores(scores):
+    """
+    Maps raw scores to 0-100 by Z-score, treating -3 to +3 standard deviations
+    as the full range. Scores are returned unchanged when all of them are equal.
+    """
+    scores = np.asarray(scores, dtype=float)
+    std_dev = scores.std() if len(scores) else 0.0
+    if std_dev == 0:
+        return scores.copy()
+    z_scores = (scores - scores.mean()) / std_dev
+    return np.round(np.clip((z_scores + 3) * (100 / 6), 0, 100), 2)
+
+
+def redistribute_scores(scores, jitter_percent=0.03, rng=None):
+    """
+    Stretches scores from the [80, 90] band Gemini tends to return onto
+    [5, 95], adding uniform jitter of up to jitter_percent of the range.
+
+    Args:
+        scores (array-like): Raw scores
+        jitter_percent (float): Jitter as a fraction of the 90 point range
+        rng (numpy.random.Generator | int | None): Generator or seed for the jitter
+    """
+    scores = np.asarray(scores, dtype=float)
+    rng = np.random.default_rng(rng)
+    stretched = (scores - 80) / 10 * 90 + 5
+    jitter = rng.uniform(-jitter_percent, jitter_percent, size=len(scores)) * 90
+    return np.clip(stretched + jitter, 5, 95)
+
+
+STRATEGIES = {
+    "percentile": percentile_scores,
+    "z_score": z_score_scores,
+    "redistribute": redistribute_scores,
+}
+
+
+def normalize(scores, strategy="percentile", rng=None, **options):
+    """
+    Normalizes an array of raw scores with the named strategy.
+
+    Args:
+        scores (array-like): Raw scores
+        strategy (str): One of "percentile", "z_score" or "redistribute"
+        rng (numpy.random.Generator | int | None): Seed or generator, used by
+            strategies with randomness
+        **options: Extra keyword arguments for the strategy
+
+    Returns:
+        tuple: (normalized numpy.ndarray, dict of summary statistics for the
+        raw and normalized scores)
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(
+            f"Unknown normalization strategy {strategy!r}, "
+            f"expected one of {sorted(STRATEGIES)}"
+        )
+    scores = np.asarray(scores, dtype=float)
+    if strategy == "redistribute":
+        options["rng"] = rng
+    normalized = STRATEGIES[strategy](scores, **options)
+
+    stats = {"strategy": strategy, "count": len(scores)}
+    for name, values in (("raw", scores), ("normalized", normalized)):
+        if len(values):
+            stats[name] = {
+                "mean": float(values.mean()),
+                "std": float(values.std()),
+                "min": float(values.min()),
+                "max": float(values.max()),
+            }
+    return normalized, stats
@@ -1,12 +1,33 @@
+import argparse
 import asyncio
-import json
 import os
+from functools import partial
 
 from flask import jsonify
 from google import genai
 
+from enrichment import enrich_all
+from entity_index import EntityIndex
+from llm_cache import LLMCache, cache_key
+from gemini import GEMINI_MODEL, acall_gemini
+from metrics import get_logger
+from prompts import PROMPT_EXCLUDED_FIELDS, build_fill_prompt, compact_record
+from record_io import (
+    RecordWriter,
+    clear_checkpoint,
+    is_ndjson,
+    load_checkpoint,
+    read_records,
+    save_checkpoint,
+    write_records,
+)
+
 API_KEY = os.getenv("GEMINI_API_KEY")
 client = genai.Client(api_key=API_KEY)
+llm_cache = LLMCache()
+log = get_logger("process_founder")
+# Records enriched and checkpointed together when streaming NDJSON
+FOUNDER_CHUNK_SIZE = int(os.getenv("FOUNDER_CHUNK_SIZE", "50"))
 
 # Define the StartUp schema
 StartUp = {
@@ -24,22 +45,26 @@ StartUp = {
 }
 
 
-async def fill_startup_data(startup_data):
-    prompt = f"""
-    Fill the following startup data:
-    {startup_data}
+async def fill_startup_data(startup_data, refresh=False):
     """
-    response = client.models.generate_content(
-        model="gemini-2.5-flash-preview-04-17",
-        contents=prompt,
-        config={
-            "response_mime_type": "application/json",
-            "response_schema": StartUp,
-        },
-    )
-
-    response_data = json.loads(response.text)
-    # print(response_data, "response_data")
+    Fills the missing fields of a startup record with Gemini. refresh asks
+    Gemini even when the answer is cached, then caches the new answer.
+    """
+    prompt = build_fill_prompt(startup_data)
+    # Records whose prompt fields are unchanged are answered from the cache
+    # without calling Gemini, keyed like the prompt: ids, LinkedIn URLs and
+    # text past the field budgets do not change the answer
+    cache_key_ = cache_key(GEMINI_MODEL, StartUp, compact_record(startup_data))
+    response_data = None if refresh else llm_cache.get(cache_key_)
+    if response_data is None:
+        response_data = await acall_gemini(
+            client,
+            "fill_startup_data",
+            prompt,
+            StartUp,
+            record_id=startup_data.get("_id"),
+        )
+        llm_cache.set(cache_key_, response_data)
     # Merge startup_data with response_data
     # Start with the original startup_data
     complete_startup_data = (
@@ -63,51 +88,226 @@ async def fill_startup_data(startup_data):
     return complete_startup_data
 
 
+# Field of a processed record holding the fingerprint of its input
+FINGERPRINT_FIELD = "_fingerprint"
+
+
+def record_fingerprint(startup_data):
+    """
+    Hash of the prompt fields of the input record together with the model and
+    schema, so a record is re-enriched when what Gemini sees, the model or
+    the schema change.
+    """
+    return cache_key(GEMINI_MODEL, StartUp, compact_record(startup_data))
+
+
+def carry_over(processed, startup_data):
+    """
+    Previous processed record of an input whose fingerprint is unchanged,
+    updated with the input fields the fingerprint leaves out, such as its
+    _id and LinkedIn URLs. Every other field keeps the enriched value.
+    """
+    record = dict(processed)
+    for field in PROMPT_EXCLUDED_FIELDS:
+        if field in startup_data:
+            record[field] = startup_data[field]
+    return record
+
+
+def load_processed_by_fingerprint(path):
+    """
+    Maps input fingerprints to the processed records of a previous run.
+    """
+    if not os.path.exists(path):
+        return {}
+    return {
+        record[FINGERPRINT_FIELD]: record
+        for record in read_records(path)
+        if FINGERPRINT_FIELD in record
+    }
+
+
+async def enrich_changed(founder_data, previous, refresh=False):
+    """
+    Enriches the records whose fingerprint is not in previous and carries the
+    others over, returning the processed records in input order and the
+    number of records enriched. refresh bypasses the LLM cache.
+    """
+    fingerprints = [record_fingerprint(data) for data in founder_data]
+    changed = [
+        data
+        for data, fingerprint in zip(founder_data, fingerprints)
+        if fingerprint not in previous
+    ]
+
+    # Fill missing fields for every changed entry concurrently,
+    # results come back in the same order as changed
+    enriched = iter(
+        await enrich_all(changed, partial(fill_startup_data, refresh=refresh))
+    )
+    # Write the access times of this batch's cache hits off the event loop
+    await asyncio.to_thread(llm_cache.flush)
+    processed_founder_data = []
+    for data, fingerprint in zip(founder_data, fingerprints):
+        if fingerprint in previous:
+            processed_founder_data.append(carry_over(previous[fingerprint], data))
+            continue
+        record = next(enriched)
+        # enrich_all hands back the input record when enrichment failed,
+        # leave it unstamped so the next run retries it
+        if record is not data:
+            record[FINGERPRINT_FIELD] = fingerprint
+        processed_founder_data.append(record)
+    return processed_founder_data, len(changed)
+
+
+async def process_founders_stream(
+    input_path, output_path, full=False, chunk_size=FOUNDER_CHUNK_SIZE
+):
+    """
+    Streams founder records from input_path through enrichment into the NDJSON
+    file output_path, one chunk at a time, so memory use does not grow with
+    the file. Every written chunk is checkpointed and an interrupted run
+    resumes after the last checkpoint; full starts over instead and bypasses
+    the LLM cache. Otherwise unchanged records are answered by the LLM cache
+    rather than a fingerprint map.
+    """
+    checkpoint = None if full else load_checkpoint(output_path)
+    done = checkpoint["done"] if checkpoint else 0
+    offset = checkpoint["offset"] if checkpoint else 0
+    if done:
+        log.info("founders_resumed", done=done, path=output_path)
+
+    # Duplicate startups across chunks are merged into their first record
+    entities = EntityIndex(":memory:")
+    llm_calls_avoided = 0
+    processed_count = 0
+    written = done
+    with RecordWriter(output_path, offset) as writer:
+
+        async def flush(chunk):
+            nonlocal processed_count, written, llm_calls_avoided
+            unique, dedup_stats = entities.resolve(chunk)
+            llm_calls_avoided += dedup_stats["llm_calls_avoided"]
+            processed, _ = await enrich_changed(unique, {}, refresh=full)
+            for record in processed:
+                writer.write(record)
+            written += len(chunk)
+            processed_count += len(chunk)
+            save_checkpoint(output_path, written, writer.flush())
+            # Failed enrichments are handed back unchanged, leave them to a rerun
+            entities.commit(
+                [
+                    record
+                    for record, result in zip(unique, processed)
+                    if result is not record
+                ]
+            )
+            log.info("founders_checkpointed", done=written, path=output_path)
+
+        chunk = []
+        for index, data in enumerate(read_records(input_path)):
+            if index < done:
+                continue
+            chunk.append(data)
+            if len(chunk) >= chunk_size:
+                await flush(chunk)
+                chunk = []
+        if chunk:
+            await flush(chunk)
+
+    clear_checkpoint(output_path)
+    log.info(
+        "founders_processed",
+        processed=processed_count,
+        duplicates=llm_calls_avoided,
+        path=output_path,
+        cache=llm_cache.stats(),
+    )
+
+
 # Process founders data from JSON file - now properly defined as async
-async def process_founders():
+async def process_founders(
+    input_path="founder_data.json",
+    output_path="processed_founder_data.json",
+    full=False,
+):
+    """
+    Enriches input_path into output_path. Records whose fingerprint matches
+    the previous output are carried over unless full is set. NDJSON paths
+    (.ndjson/.jsonl, optionally .gz) are processed by process_founders_stream.
+    """
     try:
-        # Check if the founder_data.json file exists
-        if not os.path.exists("founder_data.json"):
-            print("Error: Founder data file not found")
+        # Check if the founder data file exists
+        if not os.path.exists(input_path):
+            log.error("founder_data_missing", path=input_path)
+            return
+
+        if is_ndjson(input_path) or is_ndjson(output_path):
+            await process_founders_stream(input_path, output_path, full)
             return
 
         # Read the founder data from the JSON file
-        with open("founder_data.json", "r", encoding="utf-8") as f:
-            founder_data = json.load(f)
+        founder_data = list(read_records(input_path))
 
         if not founder_data:
-            print("No founder data found in file")
+            log.info("founder_data_empty", path=input_path)
             return
 
-        # Process each founder entry
-        processed_founder_data = []
-        processed_count = 0
-        for data in founder_data:
-            # Fill missing fields for each startup entry
-            data = await fill_startup_data(data)
-            processed_count += 1
-            # Save the processed data back to a JSON file
-            # Collect all processed data to save at the end
-            processed_founder_data.append(data)
+        # Merge duplicate startups before paying for their enrichment
+        founder_data, dedup_stats = EntityIndex(":memory:").resolve(founder_data)
+        log.info("entity_resolution", **dedup_stats)
+
+        # Only new or changed records need enrichment
+        previous = {} if full else load_processed_by_fingerprint(output_path)
+        processed_founder_data, processed_count = await enrich_changed(
+            founder_data, previous, refresh=full
+        )
+        log.info(
+            "founders_changed",
+            changed=processed_count,
+            unchanged=len(founder_data) - processed_count,
+        )
 
         # Save all processed founder data to a JSON file
         if processed_founder_data:
             try:
-                with open("processed_founder_data.json", "w", encoding="utf-8") as f:
-                    json.dump(processed_founder_data, f, indent=2, ensure_ascii=False)
-                print(
-                    f"Successfully saved {len(processed_founder_data)} processed founder records to processed_founder_data.json"
+                write_records(output_path, processed_founder_data)
+                log.info(
+                    "founder_data_saved",
+                    records=len(processed_founder_data),
+                    path=output_path,
                 )
             except Exception as e:
-                print(f"Error saving processed founder data to JSON: {str(e)}")
+                log.error("founder_data_save_failed", path=output_path, error=str(e))
         else:
-            print("No processed founder data to save")
-        print(f"Successfully processed {processed_count} founder records")
+            log.info("founder_data_empty", path=output_path)
+        log.info(
+            "founders_processed",
+            processed=processed_count,
+            path=output_path,
+            cache=llm_cache.stats(),
+        )
 
     except Exception as e:
-        print(f"Error processing founder data: {str(e)}")
+        log.error("process_founders_failed", error=str(e))
 
 
 # Run the async function with asyncio
 if __name__ == "__main__":
-    asyncio.run(process_founders())
+    parser = argparse.ArgumentParser(description="Enrich founder_data.json")
+    parser.add_argument(
+        "--input", default="founder_data.json", help="JSON or NDJSON founder records"
+    )
+    parser.add_argument(
+        "--output",
+        default="processed_founder_data.json",
+        help="JSON or NDJSON (.ndjson, .jsonl, optionally .gz) output file",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="re-enrich every record, changed or not, ignoring any checkpoint",
+    )
+    args = parser.parse_args()
+    asyncio.run(process_founders(args.input, args.output, full=args.full))
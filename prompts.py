@@ -0,0 +1,157 @@
+"""
+Compact prompt building for the Gemini enrichment and evaluation calls.
+
+Records are sent without empty fields, with long text truncated to a
+per-field budget and serialized as compact JSON, and prompt tokens are
+counted locally before the request is sent.
+"""
+
+import json
+import os
+from functools import lru_cache
+
+from metrics import get_logger
+from rate_limit import estimate_tokens
+
+# Characters kept of a text value before it is truncated
+PROMPT_FIELD_CHARS = int(os.getenv("PROMPT_FIELD_CHARS", "500"))
+# Larger budgets for the free-text fields that carry most of the signal
+FIELD_CHAR_BUDGETS = {
+    "Description": int(os.getenv("PROMPT_DESCRIPTION_CHARS", "1500")),
+    "Early Metrics": 1000,
+    "Press": 1000,
+}
+# Record fields never sent to the model: ids and LinkedIn URLs carry no
+# information it can use to fill or score a startup
+PROMPT_EXCLUDED_FIELDS = ("_id", "_fingerprint", "Founder_LinkedIn")
+# "estimate" for the four characters per token heuristic, "local" for the
+# Gemini SentencePiece tokenizer (pip install "google-genai[local-tokenizer]")
+TOKEN_COUNTER = os.getenv("TOKEN_COUNTER", "estimate")
+TOKENIZER_MODEL = "gemini-2.5-flash"
+
+log = get_logger("prompts")
+
+
+def is_empty(value):
+    if isinstance(value, str):
+        return not value.strip()
+    return value is None or value == [] or value == {}
+
+
+def truncate(text, limit):
+    if len(text) <= limit:
+        return text
+    return text[: limit - 1].rstrip() + "…"
+
+
+def compact_value(value, limit):
+    """
+    value with empty items dropped and every string truncated to limit.
+    """
+    if isinstance(value, str):
+        return truncate(" ".join(value.split()), limit)
+    if isinstance(value, list):
+        return [compact_value(item, limit) for item in value if not is_empty(item)]
+    if isinstance(value, dict):
+        return {
+            key: compact_value(item, limit)
+            for key, item in value.items()
+            if not is_empty(item)
+        }
+    return value
+
+
+def compact_record(record, fields=None, exclude=PROMPT_EXCLUDED_FIELDS):
+    """
+    Copy of the non-empty prompt fields of record, text truncated to the
+    field's budget.
+
+    Args:
+        record (dict): Startup or founder record
+        fields (iterable): Fields to keep in this order, default all of record
+        exclude (iterable): Fields never kept
+
+    Returns:
+        dict: The compacted fields
+    """
+    compacted = {}
+    for field in record if fields is None else fields:
+        value = record.get(field)
+        if field in exclude or is_empty(value):
+            continue
+        value = compact_value(value, FIELD_CHAR_BUDGETS.get(field, PROMPT_FIELD_CHARS))
+        if not is_empty(value):
+            compacted[field] = value
+    return compacted
+
+
+def serialize_record(record, fields=None):
+    """
+    Compact JSON of the prompt fields of record, replacing the Python repr
+    of the whole record.
+    """
+    return json.dumps(
+        compact_record(record, fields),
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+def format_fields(record, fields, labels=None):
+    """
+    One "- Label: value" line per non-empty field, lists joined by commas.
+    Missing fields are left out instead of being sent as "Unknown".
+    """
+    labels = labels or {}
+    lines = []
+    for field, value in compact_record(record, fields).items():
+        if isinstance(value, list):
+            value = ", ".join(map(str, value))
+        elif isinstance(value, dict):
+            value = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        lines.append(f"- {labels.get(field, field)}: {value}")
+    return "\n".join(lines)
+
+
+def compact_prompt(prompt):
+    """
+    Strips the indentation of the prompt templates and drops blank lines.
+    """
+    return "\n".join(line.strip() for line in prompt.splitlines() if line.strip())
+
+
+def build_fill_prompt(startup_data):
+    """
+    Prompt asking Gemini to fill in the missing fields of a startup record.
+    """
+    return compact_prompt(f"""
+    Fill the following startup data:
+    {serialize_record(startup_data)}
+    """)
+
+
+@lru_cache(maxsize=1)
+def _local_tokenizer():
+    try:
+        from google.genai.local_tokenizer import LocalTokenizer
+
+        return LocalTokenizer(model_name=TOKENIZER_MODEL)
+    except Exception as e:
+        log.warning("local_tokenizer_unavailable", error=str(e))
+        return None
+
+
+def count_tokens(text):
+    """
+    Prompt tokens of text counted without an API call: with the local
+    tokenizer when TOKEN_COUNTER=local and it is installed, otherwise the
+    estimate also used for rate limiting.
+    """
+    tokenizer = _local_tokenizer() if TOKEN_COUNTER == "local" else None
+    if tokenizer is not None:
+        try:
+            return tokenizer.count_tokens(text).total_tokens
+        except Exception as e:
+            log.debug("local_tokenizer_failed", error=str(e))
+    return estimate_tokens(text)
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import get_logger
+
+# SQLite file shared by every process on the host that draws from the quotas
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", ".rate_limits.sqlite")
+# Per-minute quotas, 0 disables the limit
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "1000"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+LINKD_RPM = int(os.getenv("LINKD_RPM", "60"))
+# Response tokens reserved per Gemini request until the real usage is known
+GEMINI_OUTPUT_TOKENS = int(os.getenv("GEMINI_OUTPUT_TOKENS", "500"))
+
+log = get_logger("rate_limit")
+
+
+def estimate_tokens(text):
+    # Gemini averages roughly four characters per token for English text
+    return len(text) // 4 + 1
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter on requests and, optionally, LLM tokens per minute.
+    Bucket state lives in a SQLite file, so every process using the same path
+    shares one budget. Callers wait for capacity instead of failing.
+
+    Args:
+        name (str): Quota name, e.g. "gemini"
+        requests_per_minute (int): Request quota, 0 for unlimited
+        tokens_per_minute (int): Token quota, 0 for unlimited
+        path (str): SQLite file holding the buckets
+    """
+
+    def __init__(
+        self, name, requests_per_minute, tokens_per_minute=0, path=RATE_LIMIT_PATH
+    ):
+        self.name = name
+        # bucket name -> capacity; both buckets refill fully once a minute
+        self.capacities = {}
+        if requests_per_minute:
+            self.capacities[f"{name}:requests"] = requests_per_minute
+        if tokens_per_minute:
+            self.capacities[f"{name}:tokens"] = tokens_per_minute
+        self._lock = threading.Lock()
+        # isolation_level=None so BEGIN IMMEDIATE controls the transactions
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                name TEXT PRIMARY KEY,
+                level REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """)
+
+    def _amounts(self, tokens):
+        amounts = {}
+        for bucket, capacity in self.capacities.items():
+            amount = 1 if bucket.endswith(":requests") else tokens
+            # A request larger than the whole bucket waits for a full bucket
+            amounts[bucket] = min(amount, capacity)
+        return amounts
+
+    def _levels(self, now):
+        levels = {}
+        for bucket, capacity in self.capacities.items():
+            row = self._conn.execute(
+                "SELECT level, updated_at FROM rate_buckets WHERE name = ?", (bucket,)
+            ).fetchone()
+            level, updated_at = row if row else (capacity, now)
+            refill = max(now - updated_at, 0) * capacity / 60
+            levels[bucket] = min(capacity, level + refill)
+        return levels
+
+    def _save(self, levels, now):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO rate_buckets VALUES (?, ?, ?)",
+            [(bucket, level, now) for bucket, level in levels.items()],
+        )
+
+    def try_acquire(self, tokens=0):
+        """
+        Takes one request and `tokens` tokens if all buckets have them.
+
+        Returns:
+            float: 0 when acquired, otherwise seconds until capacity is expected
+        """
+        if not self.capacities:
+            return 0
+        amounts = self._amounts(tokens)
+        with self._lock:
+            # BEGIN IMMEDIATE locks the file against other processes' writes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                levels = self._levels(now)
+                waits = [
+                    (amounts[bucket] - level) * 60 / self.capacities[bucket]
+                    for bucket, level in levels.items()
+                    if level < amounts[bucket]
+                ]
+                if not waits:
+                    for bucket in levels:
+                        levels[bucket] -= amounts[bucket]
+                self._save(levels, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return max(waits, default=0)
+
+    def settle(self, reserved, used):
+        """
+        Corrects the token bucket once the real usage of a request is known.
+        Usage above the reservation may leave the bucket in debt, which later
+        callers wait out.
+        """
+        bucket = f"{self.name}:tokens"
+        # used is 0 when the response carried no usage metadata
+        if bucket not in self.capacities or not used or used == reserved:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                levels = self._levels(now)
+                levels[bucket] = min(
+                    self.capacities[bucket], levels[bucket] + reserved - used
+                )
+                self._save({bucket: levels[bucket]}, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def acquire(self, tokens=0):
+        """
+        Blocks until one request and `tokens` tokens are available.
+        """
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            log.debug("rate_limited", limiter=self.name, wait=round(wait, 2))
+            time.sleep(wait)
+
+    async def aacquire(self, tokens=0):
+        """
+        Awaits until one request and `tokens` tokens are available. The SQLite
+        transaction runs in a worker thread, so waiting on the file lock of
+        another process does not block the event loop.
+        """
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, tokens)
+            if not wait:
+                return
+            log.debug("rate_limited", limiter=self.name, wait=round(wait, 2))
+            await asyncio.sleep(wait)
+
+
+gemini_limiter = RateLimiter("gemini", GEMINI_RPM, GEMINI_TPM)
+linkd_limiter = RateLimiter("linkd", LINKD_RPM)
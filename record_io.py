@@ -0,0 +1,145 @@
+import gzip
+import json
+import os
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl", ".ndjson.gz", ".jsonl.gz")
+
+
+def is_ndjson(path):
+    return path.endswith(NDJSON_SUFFIXES)
+
+
+def is_gzip(path):
+    return path.endswith(".gz")
+
+
+def read_records(path):
+    """
+    Yields the records of a JSON array file, or streams them one line at a
+    time from an NDJSON file (optionally gzip compressed).
+    """
+    if not is_ndjson(path):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+
+    opener = gzip.open if is_gzip(path) else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_records(path, records):
+    """
+    Writes records as a JSON array, or as NDJSON for .ndjson/.jsonl paths.
+
+    Returns:
+        int: Number of records written
+    """
+    if not is_ndjson(path):
+        records = list(records)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        return len(records)
+
+    with RecordWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+        writer.flush()
+        return writer.count
+
+
+def merge_records(path, records, key="_id"):
+    """
+    Rewrites path with its records followed by records, where a new record
+    replaces the stored one with the same key.
+
+    Returns:
+        int: Number of records written
+    """
+    records = list(records)
+    replaced = {record.get(key) for record in records} - {None}
+    stored = (
+        [
+            record
+            for record in read_records(path)
+            if record.get(key) is None or record.get(key) not in replaced
+        ]
+        if os.path.exists(path)
+        else []
+    )
+    return write_records(path, stored + records)
+
+
+class RecordWriter:
+    """
+    Appends records to an NDJSON file. Records are buffered until flush(),
+    which writes them durably and returns the file offset after them. Gzip
+    output gets one gzip member per flush, so every flush offset is a valid
+    truncation point for resuming.
+    """
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        self.count = 0
+        self._buffer = []
+        mode = "r+b" if offset and os.path.exists(path) else "wb"
+        self._file = open(path, mode)
+        # Drop anything written after the last checkpoint
+        self._file.truncate(offset)
+        self._file.seek(offset)
+
+    def write(self, record):
+        self._buffer.append(json.dumps(record, ensure_ascii=False, default=str))
+        self.count += 1
+
+    def flush(self):
+        if self._buffer:
+            data = ("\n".join(self._buffer) + "\n").encode("utf-8")
+            if is_gzip(self.path):
+                data = gzip.compress(data)
+            self._file.write(data)
+            self._buffer.clear()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def checkpoint_path(output_path):
+    return f"{output_path}.checkpoint"
+
+
+def load_checkpoint(output_path):
+    """
+    Returns the checkpoint of an interrupted run writing output_path as a dict
+    with the number of input records done and the output offset, or None.
+    """
+    path = checkpoint_path(output_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(output_path, done, offset):
+    # Write then rename, so a crash never leaves a half-written checkpoint
+    path = checkpoint_path(output_path)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"done": done, "offset": offset}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def clear_checkpoint(output_path):
+    path = checkpoint_path(output_path)
+    if os.path.exists(path):
+        os.remove(path)
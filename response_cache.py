@@ -0,0 +1,175 @@
+import asyncio
+import gzip
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+
+from werkzeug.http import http_date
+
+try:
+    import brotli
+except ImportError:  # br is only offered when the brotli package is installed
+    brotli = None
+
+
+def bump_collection_version(versions_collection, name):
+    """
+    Marks collection `name` as changed. Every writer of a cached collection
+    should call this after writing so readers rebuild their payload.
+    """
+    versions_collection.update_one(
+        {"_id": name},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+
+
+class CachedPayload:
+    """
+    Serialized response body with its validators and lazily compressed variants.
+    """
+
+    def __init__(self, body, version, last_modified):
+        self.body = body
+        self.version = version
+        self.last_modified = last_modified.replace(microsecond=0)
+        self.etag = hashlib.sha1(body).hexdigest()
+        self._encoded = {"identity": body}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding):
+        with self._lock:
+            if encoding not in self._encoded:
+                if encoding == "gzip":
+                    self._encoded[encoding] = gzip.compress(self.body)
+                elif encoding == "br":
+                    self._encoded[encoding] = brotli.compress(self.body)
+                else:
+                    raise ValueError(f"Unsupported encoding {encoding}")
+            return self._encoded[encoding]
+
+
+class CollectionPayloadCache:
+    """
+    In-process cache of a serialized collection, invalidated by the version
+    marker written by bump_collection_version.
+
+    Args:
+        versions_collection: Collection holding the version markers
+        name (str): Marker name of the cached collection
+        build (callable): Returns the serialized payload as bytes
+        check_interval (float): Seconds between version marker lookups
+        max_age (float): Seconds after which the payload is rebuilt even if the
+            marker did not change, for writers that do not bump it
+    """
+
+    def __init__(self, versions_collection, name, build, check_interval=5, max_age=300):
+        self.versions_collection = versions_collection
+        self.name = name
+        self.build = build
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._payload = None
+        self._built_at = 0
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, now):
+        return (
+            self._payload is not None and now - self._checked_at < self.check_interval
+        )
+
+    def _is_stale(self, version, now):
+        return (
+            self._payload is None
+            or self._payload.version != version
+            or now - self._built_at > self.max_age
+        )
+
+    def _store(self, body, marker, now):
+        last_modified = marker.get("updated_at") or datetime.now(timezone.utc)
+        if last_modified.tzinfo is None:
+            # PyMongo returns naive UTC datetimes by default
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        self._payload = CachedPayload(body, marker.get("version"), last_modified)
+        self._built_at = now
+
+    def get(self):
+        now = time.monotonic()
+        if self._is_fresh(now):
+            return self._payload
+
+        with self._lock:
+            marker = self.versions_collection.find_one({"_id": self.name}) or {}
+            self._checked_at = now
+            if self._is_stale(marker.get("version"), now):
+                self._store(self.build(), marker, now)
+            return self._payload
+
+    def invalidate(self):
+        with self._lock:
+            self._payload = None
+
+
+class AsyncCollectionPayloadCache(CollectionPayloadCache):
+    """
+    CollectionPayloadCache for async drivers such as Motor: the version marker
+    lookup and build are awaited.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._async_lock = asyncio.Lock()
+
+    async def get(self):
+        now = time.monotonic()
+        if self._is_fresh(now):
+            return self._payload
+
+        async with self._async_lock:
+            marker = await self.versions_collection.find_one({"_id": self.name}) or {}
+            self._checked_at = now
+            if self._is_stale(marker.get("version"), now):
+                self._store(await self.build(), marker, now)
+            return self._payload
+
+    def invalidate(self):
+        self._payload = None
+
+
+def negotiate_encoding(accept_encodings):
+    """
+    Picks the best supported content coding from a werkzeug Accept-Encoding header.
+    """
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return accept_encodings.best_match(offered, default="identity") or "identity"
+
+
+def payload_response(request, response, payload):
+    """
+    Answers a conditional GET for a CachedPayload on a Flask or Quart
+    response: sets the validators, then returns 304 when If-None-Match (or,
+    without it, If-Modified-Since) matches, otherwise the body in the best
+    encoding the client accepts.
+    """
+    response.set_etag(payload.etag, weak=True)
+    response.headers["Last-Modified"] = http_date(payload.last_modified)
+    response.vary.add("Accept-Encoding")
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(payload.etag)
+    else:
+        not_modified = (
+            request.if_modified_since is not None
+            and request.if_modified_since >= payload.last_modified
+        )
+    if not_modified:
+        response.status_code = 304
+        return response
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    response.set_data(payload.encoded(encoding))
+    return response
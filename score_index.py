@@ -0,0 +1,260 @@
+"""
+Order-statistics index over the raw scores of the startups collection, so
+percentile scores follow new evaluations without renormalizing everything.
+
+Raw scores are integers from 0 to 100, so the index is a Fenwick tree of
+company counts per raw score bucket, stored as one document next to the
+collection. Recording a raw score increments O(log B) tree entries in a
+single atomic update, and the percentile of a bucket is two prefix sums.
+Every company in a bucket shares its normalized score, so when the counts
+shift, only the buckets whose normalized score changed are rewritten, with
+one update_many on raw_score each.
+
+Usage:
+    python score_index.py rebuild
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+from pymongo import ReturnDocument
+
+from metrics import get_logger, track_query
+from normalization import spread_percentiles
+
+# _id of the index document in the score_index collection
+SCORE_INDEX_ID = "raw_score"
+# Raw scores are clamped to 0-100 by startup_evaluation.apply_evaluation
+SCORE_BUCKETS = 101
+
+log = get_logger("score_index")
+
+
+class FenwickTree:
+    """
+    Binary indexed tree of counts over buckets 0 to size - 1.
+    tree[0] is unused, bucket b is stored at 1-based position b + 1.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.size = len(tree) - 1
+
+    @classmethod
+    def from_counts(cls, counts):
+        # Linear construction: every node passes its sum on to its parent
+        tree = [0, *counts]
+        for position in range(1, len(tree)):
+            parent = position + (position & -position)
+            if parent < len(tree):
+                tree[parent] += tree[position]
+        return cls(tree)
+
+    @staticmethod
+    def positions(bucket, size):
+        """
+        Tree positions covering bucket, the entries an update must change.
+        """
+        position = bucket + 1
+        while position <= size:
+            yield position
+            position += position & -position
+
+    def add(self, bucket, delta):
+        for position in self.positions(bucket, self.size):
+            self.tree[position] += delta
+
+    def prefix_sum(self, bucket):
+        """
+        Count of buckets 0 to bucket inclusive, 0 for bucket -1.
+        """
+        total = 0
+        position = bucket + 1
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+        return total
+
+    @property
+    def total(self):
+        return self.prefix_sum(self.size - 1)
+
+
+def bucket_of(raw_score):
+    return min(max(int(raw_score), 0), SCORE_BUCKETS - 1)
+
+
+def bucket_score(tree, bucket):
+    """
+    Normalized score of the companies in bucket, equal to what
+    normalization.percentile_scores gives them over the whole collection:
+    the average rank of the bucket over n - 1, spread by the same curve.
+    Runs in O(log B).
+    """
+    below = tree.prefix_sum(bucket - 1)
+    tied = tree.prefix_sum(bucket) - below
+    total = tree.total
+    if not tied:
+        return None
+    percentile = 50.0 if total == 1 else (below + (tied - 1) / 2) / (total - 1) * 100
+    return int(spread_percentiles(percentile))
+
+
+class ScoreIndex:
+    """
+    Persistent raw score index of a companies collection.
+
+    Args:
+        collection (Collection): Collection holding the index document
+        companies (Collection): The startups collection
+    """
+
+    def __init__(self, collection, companies):
+        self.collection = collection
+        self.companies = companies
+
+    def load(self):
+        document = self.collection.find_one({"_id": SCORE_INDEX_ID})
+        return FenwickTree(document["tree"]) if document else None
+
+    def rebuild(self, raw_scores=None):
+        """
+        Recounts the raw scores and stores the tree. Without raw_scores the
+        collection's raw_score values are counted and the scores that differ
+        from the tree are rewritten. With raw_scores, the column a percentile
+        normalization has just ranked and written, the tree and the bucket
+        scores are stored from it and no document is rewritten.
+
+        Args:
+            raw_scores (array-like): Raw scores of every ranked company
+
+        Returns:
+            dict: companies indexed and documents rewritten
+        """
+        if raw_scores is None:
+            counts = [0] * SCORE_BUCKETS
+            with track_query("startups", "score_index_rebuild"):
+                groups = self.companies.aggregate(
+                    [
+                        {"$match": {"raw_score": {"$type": "number"}}},
+                        {"$group": {"_id": "$raw_score", "count": {"$sum": 1}}},
+                    ]
+                )
+                for group in groups:
+                    counts[bucket_of(group["_id"])] += group["count"]
+        else:
+            buckets = np.clip(
+                np.asarray(raw_scores, dtype=float).astype(int), 0, SCORE_BUCKETS - 1
+            )
+            counts = np.bincount(buckets, minlength=SCORE_BUCKETS).tolist()
+        tree = FenwickTree.from_counts(counts)
+        normalized = (
+            [None] * SCORE_BUCKETS
+            if raw_scores is None
+            else [bucket_score(tree, bucket) for bucket in range(SCORE_BUCKETS)]
+        )
+        self.collection.replace_one(
+            {"_id": SCORE_INDEX_ID},
+            {
+                "_id": SCORE_INDEX_ID,
+                "tree": tree.tree,
+                "normalized": normalized,
+                "updated_at": datetime.now(timezone.utc),
+            },
+            upsert=True,
+        )
+        rewritten = 0
+        if raw_scores is None:
+            rewritten = self._rewrite(tree, normalized, range(SCORE_BUCKETS))
+        summary = {"companies": tree.total, "score_writes": rewritten}
+        log.info("score_index_rebuilt", **summary)
+        return summary
+
+    def apply(self, changes):
+        """
+        Records raw score changes and rewrites the normalized scores they
+        move. Documents must already hold their new raw_score.
+
+        Args:
+            changes (iterable): (old raw score or None, new raw score or None)
+                pairs, one per company inserted, rescored or removed
+
+        Returns:
+            dict: changes applied and documents rewritten
+        """
+        deltas = {}
+        touched = set()
+        changes = list(changes)
+        for old, new in changes:
+            for raw_score, delta in ((old, -1), (new, 1)):
+                if raw_score is None:
+                    continue
+                bucket = bucket_of(raw_score)
+                touched.add(bucket)
+                for position in FenwickTree.positions(bucket, SCORE_BUCKETS):
+                    deltas[f"tree.{position}"] = (
+                        deltas.get(f"tree.{position}", 0) + delta
+                    )
+        deltas = {path: delta for path, delta in deltas.items() if delta}
+
+        if self.load() is None:
+            # The first incremental update counts the whole collection once
+            return dict(self.rebuild(), changes=len(changes))
+
+        # One atomic update returns the counts including every other writer
+        update = {"$set": {"updated_at": datetime.now(timezone.utc)}}
+        if deltas:
+            update["$inc"] = deltas
+        document = self.collection.find_one_and_update(
+            {"_id": SCORE_INDEX_ID}, update, return_document=ReturnDocument.AFTER
+        )
+        tree = FenwickTree(document["tree"])
+        rewritten = self._rewrite(tree, document["normalized"], touched)
+        summary = {"changes": len(changes), "score_writes": rewritten}
+        log.info("score_index_updated", **summary)
+        return summary
+
+    def _rewrite(self, tree, stored, touched):
+        """
+        Writes the normalized score of every bucket whose score differs from
+        stored, and of the touched buckets, where new raw scores may not have
+        a normalized score yet. Returns the number of documents modified.
+        """
+        scores = [bucket_score(tree, bucket) for bucket in range(SCORE_BUCKETS)]
+        touched = set(touched)
+        updates = {}
+        rewritten = 0
+        for bucket, score in enumerate(scores):
+            if score is None or (score == stored[bucket] and bucket not in touched):
+                continue
+            with track_query("startups", "score_index_rewrite"):
+                result = self.companies.update_many(
+                    {"raw_score": bucket, "score": {"$ne": score}},
+                    {"$set": {"score": score}},
+                )
+            rewritten += result.modified_count
+            updates[f"normalized.{bucket}"] = score
+        if updates:
+            self.collection.update_one({"_id": SCORE_INDEX_ID}, {"$set": updates})
+        return rewritten
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    if sys.argv[1:] != ["rebuild"]:
+        print(__doc__)
+        sys.exit(1)
+
+    load_dotenv()
+    db = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))[
+        "startup_database"
+    ]
+    summary = ScoreIndex(db["score_index"], db["startups"]).rebuild()
+    print(
+        f"Indexed {summary['companies']} companies, "
+        f"rewrote {summary['score_writes']} scores"
+    )
@@ -1,12 +1,30 @@
-import json
+import argparse
 import os
-import random
+import time
+from array import array
+
+import numpy as np
 
 from bson import ObjectId
 from dotenv import load_dotenv
 from google import genai
 from pydantic import BaseModel
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+
+from columnar import Snapshot
+from company_query import ID_TYPES
+from company_stats import (
+    STATS_PROJECTION,
+    refresh_company_stats,
+    refresh_snapshot_facets,
+    refresh_top,
+)
+from gemini import GEMINI_MODEL, call_gemini
+from llm_cache import LLMCache, cache_key
+from metrics import get_logger, track_query
+from normalization import normalize, redistribute_scores
+from prompts import compact_prompt, count_tokens, format_fields
+from score_index import ScoreIndex
 
 # Load environment variables
 load_dotenv()
@@ -15,8 +33,14 @@ load_dotenv()
 client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
 db = client["startup_database"]
 companies_collection = db["startups"]
+# Facet counts and leaderboard served by /api/companies/facets and /top
+stats_collection = db["company_stats"]
+# Raw score counts that place newly scored companies without a full pass
+score_index = ScoreIndex(db["score_index"], companies_collection)
 API_KEY = os.getenv("GEMINI_API_KEY")
 client = genai.Client(api_key=API_KEY)
+llm_cache = LLMCache()
+log = get_logger("startup_evaluation")
 
 
 class StartUpEvaluation(BaseModel):
@@ -25,83 +49,265 @@ class StartUpEvaluation(BaseModel):
     stage: str
 
 
-def evaluate_startup_score(startup):
+EVALUATION_CRITERIA = """
+        Based on these metrics and considering:
+        1. Market opportunity and growth potential
+        2. Team background and execution ability
+        3. Traction and early validation
+        4. Overall company positioning
+"""
+
+# Rough token budget for the company descriptions packed into one batch request
+BATCH_TOKEN_BUDGET = int(os.getenv("EVAL_BATCH_TOKEN_BUDGET", "6000"))
+# Upper bound on companies per batch request regardless of token budget
+BATCH_MAX_SIZE = int(os.getenv("EVAL_BATCH_MAX_SIZE", "25"))
+# Number of UpdateOne operations sent per bulk_write call
+SCORE_WRITE_BATCH_SIZE = int(os.getenv("SCORE_WRITE_BATCH_SIZE", "1000"))
+# Companies read, evaluated and written together by run_scoring_job
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", "500"))
+
+
+class StartUpBatchEvaluation(BaseModel):
+    id: str
+    score: int
+    funding: int
+    stage: str
+
+
+# Startup fields that feed the evaluation prompt
+EVALUATION_FIELDS = (
+    "Name",
+    "Industry",
+    "Location",
+    "Launch Date",
+    "Description",
+    "Early Metrics",
+    "Press",
+    "Founders",
+    "Website",
+    "Funding Status",
+)
+# Prompt labels of the evaluation fields that differ from the field name
+EVALUATION_LABELS = {"Press": "Press Coverage"}
+
+
+def evaluation_cache_key(startup):
+    # Only the prompt inputs are hashed, so writing back score/funding/stage
+    # does not invalidate the cached evaluation
+    inputs = {field: startup.get(field) for field in EVALUATION_FIELDS}
+    return cache_key(GEMINI_MODEL, StartUpEvaluation, inputs)
+
+
+def format_startup_metrics(startup):
+    """
+    Formats the startup fields used for evaluation as a prompt section,
+    leaving out the fields the startup does not have.
+    """
+    return format_fields(startup, EVALUATION_FIELDS, EVALUATION_LABELS)
+
+
+def apply_evaluation(startup, evaluation):
+    # raw_score keeps the Gemini score, score is only set by normalization.
+    # Clamped to 0-100, the buckets of score_index
+    startup["raw_score"] = min(max(evaluation["score"], 0), 100)
+    startup["score_fingerprint"] = evaluation_cache_key(startup)
+    startup["funding"] = evaluation["funding"]
+    startup["stage"] = evaluation["stage"]
+    return startup
+
+
+def build_evaluation_prompt(startup):
+    """
+    Prompt asking Gemini to score one startup.
+    """
+    return compact_prompt(f"""
+    Consider the following startup metrics and evaluate a score from 0-100:
+    {format_startup_metrics(startup)}
+    {EVALUATION_CRITERIA}
+    Please provide a single numerical score between 0-100.
+    From funding status, determine the state of the startup and funding in dollars as number.
+
+    return your response as:
+    {{
+        "score": int,
+        "funding": int,
+        "stage": str
+    }}
+""")
+
+
+def evaluate_startup_score(startup, refresh=False):
     """
     Evaluates a startup and returns a score based on various metrics using Gemini AI.
 
     Args:
         startup (dict): Dictionary containing startup information
+        refresh (bool): Ask Gemini even when the evaluation is cached, then
+            cache the new answer
 
     Returns:
         float: Score between 0-100 indicating startup potential
     """
     try:
-        # Prepare the prompt with startup data
-        prompt = f"""
-        Consider the following startup metrics and evaluate a score from 0-100:
-
-        Company Overview:
-        - Name: {startup.get('Name', 'Unknown')}
-        - Industry: {startup.get('Industry', 'Unknown')} 
-        - Location: {startup.get('Location', 'Unknown')}
-        - Launch Date: {startup.get('Launch Date', 'Unknown')}
-        - Description: {startup.get('Description', 'Unknown')}
-
-        Traction & Growth:
-        - Early Metrics: {startup.get('Early Metrics', 'Unknown')}
-        - Press Coverage: {startup.get('Press', 'Unknown')}
-
-        Team:
-        - Founders: {startup.get('Founders', 'Unknown')}
-        - Website: {startup.get('Website', 'Unknown')}
-        - Funding Status: {startup.get('Funding Status', 'Unknown')}
-
-        Based on these metrics and considering:
-        1. Market opportunity and growth potential
-        2. Team background and execution ability
-        3. Traction and early validation
-        4. Overall company positioning
-
-        Please provide a single numerical score between 0-100.
-        From funding status, determine the state of the startup and funding in dollars as number.
-
-        return your response as:
-        {{
-            "score": int,
-            "funding": int,
-            "stage": str
-        }}
-    """
-        # Call Gemini API to get the score
-        # Note: Implementation of actual API call would go here
-        # For now returning a placeholder score based on revenue as fallback
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-preview-04-17",
-            contents=prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": StartUpEvaluation,
-            },
+        cached = None if refresh else llm_cache.get(evaluation_cache_key(startup))
+        if cached is not None:
+            return apply_evaluation(startup, cached)
+
+        # Call Gemini API to get the score, waiting for room in the shared quota
+        response_data = call_gemini(
+            client,
+            "evaluate_startup_score",
+            build_evaluation_prompt(startup),
+            StartUpEvaluation,
+            startup_id=startup.get("_id"),
         )
-        response_data = json.loads(response.text)
+        llm_cache.set(evaluation_cache_key(startup), response_data)
 
-        print(response_data, "response_data")
         # Add the score to the startup dictionary
-        startup["score"] = min(response_data["score"], 100)
-        startup["funding"] = response_data["funding"]
-        startup["stage"] = response_data["stage"]
-        print(json.dumps(startup, indent=4), "startup")
+        apply_evaluation(startup, response_data)
+        log.debug("startup_evaluated", startup=startup)
         return startup
 
     except Exception as e:
-        print(f"Error evaluating startup: {str(e)}")
+        log.error(
+            "evaluate_startup_failed", startup_id=startup.get("_id"), error=str(e)
+        )
         return 0
 
 
+def chunk_startups(startups, token_budget=BATCH_TOKEN_BUDGET, max_size=BATCH_MAX_SIZE):
+    """
+    Splits startups into chunks whose formatted metrics fit within token_budget.
+    A single startup larger than the budget gets a chunk of its own.
+    """
+    chunk = []
+    chunk_tokens = 0
+    for startup in startups:
+        tokens = count_tokens(format_startup_metrics(startup))
+        if chunk and (chunk_tokens + tokens > token_budget or len(chunk) >= max_size):
+            yield chunk
+            chunk = []
+            chunk_tokens = 0
+        chunk.append(startup)
+        chunk_tokens += tokens
+    if chunk:
+        yield chunk
+
+
+def build_batch_evaluation_prompt(startups):
+    """
+    Prompt asking Gemini to score several startups, one "Startup id" section
+    per startup.
+    """
+    sections = "\n".join(f"""
+        Startup id: {startup["_id"]}
+        {format_startup_metrics(startup)}""" for startup in startups)
+    return compact_prompt(f"""
+        Consider the following {len(startups)} startups and evaluate each one with a score from 0-100:
+        {sections}
+        {EVALUATION_CRITERIA}
+        For every startup provide a single numerical score between 0-100.
+        From funding status, determine the state of the startup and funding in dollars as number.
+
+        return your response as a list with one entry per startup, using the startup id given above:
+        [
+            {{
+                "id": str,
+                "score": int,
+                "funding": int,
+                "stage": str
+            }}
+        ]
+    """)
+
+
+def evaluate_startup_batch(startups):
+    """
+    Evaluates several startups with a single Gemini request.
+
+    Args:
+        startups (list): Startup dictionaries, each with an "_id"
+
+    Returns:
+        dict: Evaluation dictionaries keyed by the startup "_id" as a string
+    """
+    # Batch answers grow with the batch, reserve output tokens per startup
+    response_data = call_gemini(
+        client,
+        "evaluate_startup_batch",
+        build_batch_evaluation_prompt(startups),
+        list[StartUpBatchEvaluation],
+        reserve_outputs=len(startups),
+        startups=len(startups),
+    )
+    return {str(item["id"]): item for item in response_data}
+
+
+def evaluate_startup_scores(startups, token_budget=BATCH_TOKEN_BUDGET, refresh=False):
+    """
+    Evaluates startups in token-budgeted batches, one Gemini request per batch.
+    Startups with a cached evaluation are answered without a request.
+    Startups missing from a batch response, or whole batches whose response
+    cannot be parsed, fall back to evaluate_startup_score one at a time.
+
+    Args:
+        startups (list): Startup dictionaries, each with an "_id"
+        token_budget (int): Approximate prompt tokens per batch
+        refresh (bool): Ask Gemini for every startup, cached or not, and
+            cache the new answers
+
+    Returns:
+        list: The evaluated startups, in input order
+    """
+    request_count = 0
+    fallback_count = 0
+
+    pending = []
+    for startup in startups:
+        cached = None if refresh else llm_cache.get(evaluation_cache_key(startup))
+        if cached is not None:
+            apply_evaluation(startup, cached)
+        else:
+            pending.append(startup)
+
+    for chunk in chunk_startups(pending, token_budget):
+        request_count += 1
+        try:
+            evaluations = evaluate_startup_batch(chunk)
+        except Exception as e:
+            log.error("evaluate_batch_failed", startups=len(chunk), error=str(e))
+            evaluations = {}
+
+        for startup in chunk:
+            evaluation = evaluations.get(str(startup["_id"]))
+            try:
+                apply_evaluation(startup, evaluation)
+                llm_cache.set(
+                    evaluation_cache_key(startup),
+                    {key: evaluation[key] for key in ("score", "funding", "stage")},
+                )
+            except Exception:
+                # Missing or malformed entry, score this startup on its own
+                request_count += 1
+                fallback_count += 1
+                evaluate_startup_score(startup, refresh)
+
+    llm_cache.flush()
+    log.info(
+        "startups_evaluated",
+        startups=len(startups),
+        requests=request_count,
+        fallbacks=fallback_count,
+        cache=llm_cache.stats(),
+    )
+    return startups
+
+
 def get_all_companies():
     try:
         # Fetch all documents from the collection
-        companies = list(companies_collection.find())
+        with track_query("startups", "get_all_companies"):
+            companies = list(companies_collection.find())
 
         # Convert ObjectId to string for each document
         for company in companies:
@@ -109,166 +315,457 @@ def get_all_companies():
 
         return companies
     except Exception as e:
-        print(f"Error fetching companies: {str(e)}")
+        log.error("get_all_companies_failed", error=str(e))
         return []
 
 
-def normalize_scores_z_score(companies):
+def select_changed_companies(companies):
+    """
+    Returns the companies whose evaluation inputs, model or schema changed
+    since they were last scored, including companies never scored.
+    """
+    return [
+        company
+        for company in companies
+        if company.get("score_fingerprint") != evaluation_cache_key(company)
+    ]
+
+
+def document_id(company_id):
+    # Documents inserted by hand use ObjectIds, pipeline records use plain strings
+    return ObjectId(company_id) if ObjectId.is_valid(company_id) else company_id
+
+
+def write_scores(companies, batch_size=SCORE_WRITE_BATCH_SIZE, include_score=False):
+    """
+    Writes raw score, fingerprint, funding and stage of every evaluated company
+    back to the database using unordered bulk_write batches. The normalized
+    score is only written with include_score, so readers never see a raw
+    Gemini score in the score field.
+
+    Args:
+        companies (list): Company dictionaries with a string "_id"
+        batch_size (int): Number of updates sent per bulk_write call
+        include_score (bool): Also write the normalized "score" field
+
+    Returns:
+        dict: Matched and modified document counts and the number of batches sent
+    """
+    summary = {"matched": 0, "modified": 0, "batches": 0}
+    operations = []
+
+    def flush():
+        with track_query("startups", "write_scores"):
+            result = companies_collection.bulk_write(operations, ordered=False)
+        summary["matched"] += result.matched_count
+        summary["modified"] += result.modified_count
+        summary["batches"] += 1
+        operations.clear()
+
+    fields = ("raw_score", "score_fingerprint", "funding", "stage")
+    if include_score:
+        fields += ("score",)
+    for company in companies:
+        if "raw_score" not in company and not (include_score and "score" in company):
+            continue
+        operations.append(
+            UpdateOne(
+                {"_id": document_id(company["_id"])},
+                {
+                    "$set": {
+                        field: company[field] for field in fields if field in company
+                    }
+                },
+            )
+        )
+        if len(operations) >= batch_size:
+            flush()
+    if operations:
+        flush()
+
+    log.info("scores_written", **summary)
+    return summary
+
+
+def normalize_company_scores(
+    companies, strategy="percentile", rng=None, batch_size=SCORE_WRITE_BATCH_SIZE
+):
+    """
+    Normalizes the scores of all scored companies in a single columnar pass,
+    writes them back to the database and refreshes the company stats.
+
+    Args:
+        companies (list): Company dictionaries with a string "_id"
+        strategy (str): Normalization strategy name, see normalization.STRATEGIES
+        rng (numpy.random.Generator | int | None): Seed for strategies with jitter
+        batch_size (int): Number of updates sent per bulk_write call
+
+    Returns:
+        dict: Summary statistics with the write_scores summary under "write",
+        or None when there are no scores to normalize
+    """
+    scored_companies = [
+        company
+        for company in companies
+        if isinstance(company.get("raw_score", company.get("score")), (int, float))
+    ]
+    if not scored_companies:
+        log.info("normalize_skipped", reason="no scores")
+        return
+
+    normalized_scores, stats = normalize(
+        [
+            company.get("raw_score", company.get("score"))
+            for company in scored_companies
+        ],
+        strategy,
+        rng,
+    )
+    for company, normalized_score in zip(scored_companies, normalized_scores):
+        company["score"] = (
+            int(normalized_score)
+            if strategy == "percentile"
+            else float(normalized_score)
+        )
+
+    # Update in database
+    stats["write"] = write_scores(scored_companies, batch_size, include_score=True)
+    with track_query("company_stats", "refresh"):
+        refresh_company_stats(stats_collection, companies)
+    return stats
+
+
+def print_normalized_scores(title, companies):
+    print(f"\n{title}:")
+    for company in companies:
+        if "score" in company:
+            company_name = company.get("Name", "Unknown Company")
+            print(f"{company_name}: {company['score']}")
+
+
+def normalize_scores_z_score(companies, batch_size=SCORE_WRITE_BATCH_SIZE):
     """
     Normalize the scores of all companies using Z-score standardization.
     This method produces scores based on how many standard deviations a company is from the mean.
     Z-score = (x - mean) / standard_deviation
+    Returns the normalization statistics, including the bulk update summary.
     """
     try:
-        # Extract scores
+        # Avoid division by zero
         scores = [
-            company.get("score", 0) for company in companies if "score" in company
+            company.get("raw_score", company.get("score"))
+            for company in companies
+            if "raw_score" in company or "score" in company
         ]
-
-        if not scores:
-            print("No scores found to normalize")
+        if len(set(scores)) == 1:
+            log.info("normalize_skipped", reason="all companies have the same score")
             return
 
-        # Calculate mean and standard deviation
-        mean_score = sum(scores) / len(scores)
-        std_dev = (sum((x - mean_score) ** 2 for x in scores) / len(scores)) ** 0.5
-
-        # Avoid division by zero
-        if std_dev == 0:
-            print("Standard deviation is zero, all companies have the same score")
+        stats = normalize_company_scores(companies, "z_score", batch_size=batch_size)
+        if stats is None:
             return
 
-        # Normalize each company's score using Z-score
-        for company in companies:
-            if "score" in company:
-                # Apply Z-score normalization
-                z_score = (company["score"] - mean_score) / std_dev
-
-                # Convert to a 0-100 scale (typically z-scores range from -3 to +3)
-                # Scale to make most scores fall between 0-100
-                normalized_score = min(max((z_score + 3) * (100 / 6), 0), 100)
-                company["score"] = round(normalized_score, 2)
-
-                # Update in database
-                companies_collection.update_one(
-                    {"_id": ObjectId(company["_id"])},
-                    {
-                        "$set": {
-                            "score": company["score"],
-                            "funding": company["funding"],
-                            "stage": company["stage"],
-                        }
-                    },
-                )
-
-        # Print normalized scores for all companies
-        print("\nZ-Score Normalized Scores:")
-        for company in companies:
-            if "score" in company:
-                company_name = company.get("name", "Unknown Company")
-                print(f"{company_name}: {company['score']}")
-
-        print(
-            f"Successfully normalized scores using Z-score for {len(companies)} companies"
-        )
+        print_normalized_scores("Z-Score Normalized Scores", companies)
+        log.info("scores_normalized", strategy="z_score", companies=len(companies))
+        return stats
 
     except Exception as e:
-        print(f"Error normalizing scores with Z-score: {str(e)}")
+        log.error("normalize_failed", strategy="z_score", error=str(e))
 
 
-def redistribute_data(data, jitter_percent=0.03):
-    new_data = []
-    for value in data:
-        # Normalize from [80, 90] to [0, 1]
-        normalized = (value - 80) / 10
-        # Stretch to [5, 95]
-        stretched = normalized * 90 + 5
-        # Add random jitter (± jitter_percent * 90)
-        jitter = random.uniform(-jitter_percent, jitter_percent) * 90
-        jittered = stretched + jitter
-        # Clamp to [5, 95]
-        jittered = max(5, min(95, jittered))
-        new_data.append(jittered)
-    return new_data
+def redistribute_data(data, jitter_percent=0.03, rng=None):
+    """
+    Stretches scores from [80, 90] to [5, 95] with random jitter.
+    Pass a seed or numpy Generator as rng for reproducible results.
+    """
+    return redistribute_scores(data, jitter_percent, rng).tolist()
 
 
-def normalize_scores_with_percentile(companies):
+def normalize_scores_with_percentile(companies, batch_size=SCORE_WRITE_BATCH_SIZE):
     """
     Normalize company scores using percentile ranking to create a more evenly distributed score range.
     This approach is less sensitive to outliers than Z-score or min-max normalization.
+    Returns the normalization statistics, including the bulk update summary.
     """
     try:
-        # Extract scores
-        scores = [
-            company.get("score", 0) for company in companies if "score" in company
-        ]
-
-        if not scores:
-            print("No scores found to normalize")
+        stats = normalize_company_scores(companies, "percentile", batch_size=batch_size)
+        if stats is None:
             return
 
-        # Sort scores for percentile calculation
-        sorted_scores = sorted(scores)
+        print_normalized_scores("Percentile-Based Normalized Scores", companies)
+        log.info("scores_normalized", strategy="percentile", companies=len(companies))
+        return stats
 
-        # Normalize each company's score using percentile ranking
-        for company in companies:
-            if "score" in company:
-                # Calculate percentile rank (0-100 scale)
-                rank = sorted_scores.index(company["score"])
-                percentile = (
-                    (rank / (len(sorted_scores) - 1)) * 100
-                    if len(sorted_scores) > 1
-                    else 50
+    except Exception as e:
+        log.error("normalize_failed", strategy="percentile", error=str(e))
+
+
+# Fields run_scoring_job reads: the evaluation inputs and stored results
+SCORING_PROJECTION = {
+    field: 1
+    for field in (
+        *EVALUATION_FIELDS,
+        "score",
+        "raw_score",
+        "score_fingerprint",
+        "funding",
+        "stage",
+    )
+}
+
+
+def iter_company_batches(
+    batch_size=SCORING_BATCH_SIZE, projection=SCORING_PROJECTION, query=None
+):
+    """
+    Yields the companies matching query in lists of at most batch_size, in
+    _id order per _id type. Every batch is a separate query resuming after
+    the last _id, so the time spent evaluating a batch cannot expire a
+    server-side cursor.
+    """
+    query = query or {}
+    for id_type in ID_TYPES:
+        page_query = {**query, "_id": {"$type": id_type}}
+        while True:
+            with track_query("startups", "scoring_batch"):
+                batch = list(
+                    companies_collection.find(page_query, projection)
+                    .sort("_id", 1)
+                    .limit(batch_size)
                 )
+            if not batch:
+                break
+            yield batch
+            page_query = {**query, "_id": {"$type": id_type, "$gt": batch[-1]["_id"]}}
 
-                # Apply sigmoid transformation to spread out the middle values
-                # This creates a more balanced distribution with fewer companies clustered at extremes
-                if percentile < 50:
-                    adjusted_score = 25 * (percentile / 50) ** 0.8
-                else:
-                    adjusted_score = 75 + 25 * ((percentile - 50) / 50) ** 1.2
-
-                company["score"] = round(adjusted_score)
-
-                # Update in database
-                companies_collection.update_one(
-                    {"_id": ObjectId(company["_id"])},
-                    {
-                        "$set": {
-                            "score": company["score"],
-                            "funding": company["funding"],
-                            "stage": company["stage"],
-                        }
-                    },
-                )
 
-        # Print normalized scores for all companies
-        print("\nPercentile-Based Normalized Scores:")
-        for company in companies:
-            if "score" in company:
-                company_name = company.get("Name", "Unknown Company")
-                print(f"{company_name}: {company['score']}")
+def write_normalized_scores(ids, scores, batch_size=SCORE_WRITE_BATCH_SIZE):
+    """
+    Writes scores[i] to the company with _id ids[i] in bulk_write batches.
+    Returns the number of batches sent.
+    """
+    batches = 0
+    for offset in range(0, len(ids), batch_size):
+        operations = [
+            UpdateOne({"_id": company_id}, {"$set": {"score": score}})
+            for company_id, score in zip(
+                ids[offset : offset + batch_size],
+                scores[offset : offset + batch_size],
+            )
+        ]
+        with track_query("startups", "write_normalized_scores"):
+            companies_collection.bulk_write(operations, ordered=False)
+        batches += 1
+    return batches
+
+
+def run_scoring_job(
+    full=False, batch_size=SCORING_BATCH_SIZE, strategy="percentile", report=None
+):
+    """
+    Evaluates and normalizes the whole startups collection in two streaming
+    passes. The first reads batch_size companies at a time, evaluates the new
+    or changed ones and writes their raw scores, keeping only compact columns
+    of _id, raw score and stored score. The second normalizes the raw score
+    column and writes back only the scores that changed. Memory use grows
+    with batch_size plus the columns, not with document size.
+
+    Args:
+        full (bool): Re-evaluate every company, changed or not
+        batch_size (int): Companies per read, evaluation and write batch
+        strategy (str): Normalization strategy name, see normalization.STRATEGIES
+        report (callable): report(**counters) receives progress after every
+            batch, compatible with JobQueue handlers
+
+    Returns:
+        dict: Counters, throughput and the normalization statistics
+    """
+    report = report or (lambda **counters: None)
+    ids = []
+    raw_scores = array("d")
+    stored_scores = array("d")
+    progress = {"processed": 0, "evaluated": 0, "failed": 0}
+    start = time.perf_counter()
+
+    for batch in iter_company_batches(batch_size):
+        pending = batch if full else select_changed_companies(batch)
+        if pending:
+            # A full pass asks Gemini again instead of replaying the cache
+            evaluate_startup_scores(pending, refresh=full)
+            # Failed evaluations keep their previous fingerprint
+            evaluated = [
+                company
+                for company in pending
+                if company.get("score_fingerprint") == evaluation_cache_key(company)
+            ]
+            write_scores(evaluated, batch_size)
+            progress["evaluated"] += len(evaluated)
+            progress["failed"] += len(pending) - len(evaluated)
+
+        for company in batch:
+            raw_score = company.get("raw_score", company.get("score"))
+            if not isinstance(raw_score, (int, float)):
+                continue
+            ids.append(company["_id"])
+            raw_scores.append(raw_score)
+            stored_score = company.get("score")
+            stored_scores.append(
+                stored_score if isinstance(stored_score, (int, float)) else np.nan
+            )
+
+        progress["processed"] += len(batch)
+        elapsed = time.perf_counter() - start
+        progress["companies_per_s"] = round(progress["processed"] / elapsed, 1)
+        log.info("scoring_progress", **progress)
+        report(**progress)
+
+    summary = dict(progress, scored=len(ids), score_writes=0)
+    if ids:
+        normalized, summary["normalization"] = normalize(raw_scores, strategy)
+        if strategy == "percentile":
+            normalized = normalized.astype(int)
+        # NaN never compares equal, companies without a stored score are written
+        changed = np.flatnonzero(normalized != np.frombuffer(stored_scores))
+        write_normalized_scores(
+            [ids[index] for index in changed], normalized[changed].tolist()
+        )
+        summary["score_writes"] = len(changed)
+        if strategy == "percentile":
+            # Index the ranked column so score_new_companies starts from this pass
+            score_index.rebuild(raw_scores)
+        with track_query("company_stats", "refresh"):
+            refresh_company_stats(
+                stats_collection, companies_collection.find({}, STATS_PROJECTION)
+            )
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    log.info(
+        "scoring_finished",
+        **{key: value for key, value in summary.items() if key != "normalization"},
+    )
+    return summary
+
+
+def score_new_companies(batch_size=SCORING_BATCH_SIZE):
+    """
+    Evaluates the companies that were never scored and places them in the
+    percentile distribution through score_index: only the scores whose
+    percentile moved are rewritten, instead of renormalizing the whole
+    collection with run_scoring_job. The leaderboard is reread when scores
+    moved; facet counts are left to the next full pass.
 
-        print(
-            f"Successfully normalized scores using percentile ranking for {len(companies)} companies"
+    Args:
+        batch_size (int): Companies read, evaluated and written together
+
+    Returns:
+        dict: Evaluated and failed counts plus the score_index summary
+    """
+    changes = []
+    summary = {"evaluated": 0, "failed": 0, "score_writes": 0}
+    for batch in iter_company_batches(
+        batch_size, query={"score_fingerprint": {"$exists": False}}
+    ):
+        previous = {
+            company["_id"]: company.get("raw_score")
+            for company in batch
+            if isinstance(company.get("raw_score"), (int, float))
+        }
+        evaluate_startup_scores(batch)
+        evaluated = [
+            company
+            for company in batch
+            if company.get("score_fingerprint") == evaluation_cache_key(company)
+        ]
+        write_scores(evaluated, batch_size)
+        changes.extend(
+            (previous.get(company["_id"]), company["raw_score"])
+            for company in evaluated
         )
+        summary["evaluated"] += len(evaluated)
+        summary["failed"] += len(batch) - len(evaluated)
 
-    except Exception as e:
-        print(f"Error normalizing scores with percentile ranking: {str(e)}")
+    if changes:
+        summary.update(score_index.apply(changes))
+    if summary["score_writes"]:
+        with track_query("startups", "refresh_top"):
+            refresh_top(stats_collection, companies_collection)
+    log.info("new_companies_scored", **summary)
+    return summary
+
+
+def normalize_snapshot(path, strategy="percentile", write=True):
+    """
+    Normalizes scores from a columnar snapshot (see columnar.py) instead of
+    loading documents: the raw score column is memory-mapped, normalized in
+    one vectorized call, and only the scores that changed are written back.
+    Facet counts are refreshed from the categorical columns and the
+    leaderboard is reread from the new scores.
+
+    Args:
+        path (str): Snapshot directory written by columnar.export_snapshot
+        strategy (str): Normalization strategy name, see normalization.STRATEGIES
+        write (bool): Write scores and facets back to the database
+
+    Returns:
+        dict: Normalization statistics plus score_writes, or None when the
+        snapshot holds no scores
+    """
+    snapshot = Snapshot(path)
+    raw_scores = snapshot.raw_scores()
+    scored = np.flatnonzero(~np.isnan(raw_scores))
+    if not len(scored):
+        log.info("normalize_skipped", reason="no scores", snapshot=path)
+        return
+
+    normalized, stats = normalize(raw_scores[scored], strategy)
+    if strategy == "percentile":
+        normalized = normalized.astype(int)
+    changed = np.flatnonzero(normalized != snapshot["score"][scored])
+    stats["score_writes"] = len(changed)
+
+    if write:
+        write_normalized_scores(
+            snapshot.ids(scored[changed]), normalized[changed].tolist()
+        )
+        with track_query("company_stats", "refresh_facets"):
+            refresh_snapshot_facets(stats_collection, snapshot)
+        with track_query("startups", "refresh_top"):
+            refresh_top(stats_collection, companies_collection)
+    log.info(
+        "snapshot_normalized",
+        snapshot=path,
+        strategy=strategy,
+        companies=snapshot.count,
+        score_writes=stats["score_writes"],
+    )
+    return stats
 
 
 if __name__ == "__main__":
-    # Fetch and print all companies
-    all_companies = get_all_companies()
-    print(f"Found {len(all_companies)} companies:")
-    for company in all_companies:
-        company = evaluate_startup_score(company)
-
-        # Collect all scores for normalization
-        all_scores = [c.get("score", 0) for c in all_companies if "score" in c]
-
-        # Normalize scores after all companies have been evaluated
-        if (
-            len(all_companies) == all_companies.index(company) + 1
-        ):  # If this is the last company
-            normalize_scores_with_percentile(all_companies)
+    parser = argparse.ArgumentParser(description="Score and normalize startups")
+    parser.add_argument(
+        "--full", action="store_true", help="re-score every company, changed or not"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=SCORING_BATCH_SIZE,
+        help="companies read and evaluated per batch",
+    )
+    parser.add_argument(
+        "--new",
+        action="store_true",
+        help="only score companies never scored, updating percentiles incrementally",
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="only re-normalize, from a columnar snapshot directory (see columnar.py)",
+    )
+    args = parser.parse_args()
+
+    if args.snapshot:
+        normalize_snapshot(args.snapshot)
+    elif args.new:
+        score_new_companies(batch_size=args.batch_size)
+    else:
+        run_scoring_job(full=args.full, batch_size=args.batch_size)
@@ -0,0 +1,30 @@
+"""
+Offline test setup: the application modules connect to MongoDB at import
+time, so every pymongo.MongoClient becomes one shared mongomock client
+before they are imported. Tests use the fakes of benchmarks/fakes.py and
+need pytest and mongomock (pip install pytest mongomock).
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+WORKDIR = tempfile.mkdtemp(prefix="startup-tests-")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ["JOB_WORKERS"] = "0"
+os.environ["GEMINI_RPM"] = os.environ["GEMINI_TPM"] = os.environ["LINKD_RPM"] = "0"
+os.environ["RATE_LIMIT_PATH"] = os.path.join(WORKDIR, "rate_limits.sqlite")
+os.environ["LLM_CACHE_PATH"] = os.path.join(WORKDIR, "llm_cache.sqlite")
+os.environ["ENTITY_INDEX_PATH"] = os.path.join(WORKDIR, "entity_index.sqlite")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ["ENRICH_BACKOFF"] = "0"
+
+import mongomock  # noqa: E402
+import pymongo  # noqa: E402
+
+MONGO = mongomock.MongoClient()
+pymongo.MongoClient = lambda *args, **kwargs: MONGO
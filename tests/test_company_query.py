@@ -0,0 +1,58 @@
+import mongomock
+import pytest
+from bson import ObjectId
+
+from company_query import CompaniesRequest
+
+
+@pytest.fixture
+def companies():
+    collection = mongomock.MongoClient().db.startups
+    collection.insert_many(
+        [
+            {"_id": "pipeline-a", "score": 50},
+            {"_id": "pipeline-b", "score": 50},
+            {"_id": ObjectId(), "score": 50},
+            {"_id": ObjectId(), "score": 50},
+            {"_id": "pipeline-c", "score": 70},
+            {"_id": ObjectId(), "score": 30},
+            {"_id": "pipeline-d"},
+            {"_id": ObjectId()},
+        ]
+    )
+    return collection
+
+
+def walk(collection, **options):
+    """
+    Ids of every page of a limit=2 /api/companies walk, in order.
+    """
+    ids, cursor = [], None
+    while True:
+        body = dict(options, limit=2, cursor=cursor)
+        request = CompaniesRequest(body, {})
+        documents = list(
+            collection.find(request.query, request.projection)
+            .sort(request.sort)
+            .limit(request.limit + 1)
+        )
+        page, cursor = request.page(documents)
+        ids.extend(company["_id"] for company in page)
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"order": "desc"},
+        {"sort": "score"},
+        {"sort": "score", "order": "asc"},
+    ],
+)
+def test_cursor_pages_across_id_types(companies, options):
+    ids = walk(companies, **options)
+
+    assert sorted(ids) == sorted(str(company["_id"]) for company in companies.find())
+    assert len(set(ids)) == len(ids)
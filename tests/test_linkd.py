@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import linkd
+from fakes import LinkdStubServer
+from linkd import LinkdClient
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """
+    Delays the client waited between attempts, without sleeping.
+    """
+    delays = []
+    monkeypatch.setattr(linkd, "time", SimpleNamespace(sleep=delays.append))
+    return delays
+
+
+def client_for(stub, **kwargs):
+    kwargs.setdefault("page_size", 30)
+    return LinkdClient(token="test", url=stub.url, **kwargs)
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_iter_pages_walks_every_page(prefetch):
+    with LinkdStubServer(95) as stub:
+        client = client_for(stub)
+        pages = asyncio.run(collect(client.iter_pages("Founders", prefetch=prefetch)))
+
+    assert [len(page["results"]) for page in pages] == [30, 30, 30, 5]
+    assert stub.requests == 4
+
+
+def test_iter_profiles_stops_after_the_page_reaching_max_results():
+    with LinkdStubServer(200) as stub:
+        client = client_for(stub)
+        profiles = asyncio.run(
+            collect(client.iter_profiles("Founders", max_results=45))
+        )
+
+    assert len(profiles) == 60
+    assert stub.requests == 2
+
+
+def test_retries_honour_retry_after(sleeps):
+    with LinkdStubServer(10, failures=[(429, 3), (503, 1)]) as stub:
+        page = client_for(stub, retries=2, backoff=100).search("Founders")
+
+    assert len(page["results"]) == 10
+    assert stub.requests == 3
+    assert sleeps == [3.0, 1.0]
+
+
+def test_retry_without_retry_after_backs_off(sleeps):
+    with LinkdStubServer(10, failures=[(503, None)]) as stub:
+        client_for(stub, retries=1, backoff=1.0).search("Founders")
+
+    assert stub.requests == 2
+    assert len(sleeps) == 1 and 0.5 <= sleeps[0] <= 1.5
+
+
+def test_gives_up_after_retries(sleeps):
+    with LinkdStubServer(10, failures=[(503, 0)] * 5) as stub:
+        client = client_for(stub, retries=2)
+        with pytest.raises(requests.HTTPError):
+            client.search("Founders")
+
+    assert stub.requests == 3
+    assert len(sleeps) == 2
+
+
+def test_iter_pages_retries_a_failed_page(sleeps):
+    with LinkdStubServer(60, failures=[(429, 0)]) as stub:
+        client = client_for(stub, retries=1)
+        pages = asyncio.run(collect(client.iter_pages("Founders")))
+
+    assert [len(page["results"]) for page in pages] == [30, 30]
+    assert stub.requests == 3
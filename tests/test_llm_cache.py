@@ -0,0 +1,49 @@
+from llm_cache import LLMCache
+
+
+def accessed_at(cache, key):
+    (value,) = cache._conn.execute(
+        "SELECT accessed_at FROM llm_cache WHERE key = ?", (key,)
+    ).fetchone()
+    return value
+
+
+def test_hits_do_not_write_until_flushed():
+    cache = LLMCache(":memory:", touch_batch=100)
+    cache.set("a", {"score": 1})
+    before = accessed_at(cache, "a")
+    changes = cache._conn.total_changes
+
+    for _ in range(10):
+        assert cache.get("a") == {"score": 1}
+
+    assert cache._conn.total_changes == changes
+    cache.flush()
+    assert accessed_at(cache, "a") > before
+    assert cache.stats()["hits"] == 10
+
+
+def test_touches_are_written_in_batches():
+    cache = LLMCache(":memory:", touch_batch=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    changes = cache._conn.total_changes
+
+    cache.get("a")
+    assert cache._conn.total_changes == changes
+    cache.get("b")
+    assert cache._conn.total_changes == changes + 2
+
+
+def test_eviction_sees_pending_hits():
+    cache = LLMCache(":memory:", max_entries=2, touch_batch=100)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # "a" is now the most recently used, so "b" is evicted
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
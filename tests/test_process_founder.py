@@ -0,0 +1,40 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+import process_founder
+from conftest import ROOT
+from fakes import FakeGeminiClient
+from llm_cache import LLMCache
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    client = FakeGeminiClient()
+    monkeypatch.setattr(process_founder, "client", client)
+    monkeypatch.setattr(process_founder, "llm_cache", LLMCache(":memory:"))
+    return client
+
+
+def test_rerun_keeps_the_enrichment_of_unchanged_records(gemini, tmp_path):
+    input_path = tmp_path / "founder_data.json"
+    output_path = str(tmp_path / "processed_founder_data.json")
+    shutil.copy(os.path.join(ROOT, "sample_data", "founder_data.json"), input_path)
+
+    asyncio.run(process_founder.process_founders(str(input_path), output_path))
+    with open(output_path) as f:
+        first = json.load(f)
+    calls = gemini.calls["n"]
+
+    asyncio.run(process_founder.process_founders(str(input_path), output_path))
+    with open(output_path) as f:
+        second = json.load(f)
+
+    assert gemini.calls["n"] == calls
+    assert [(record["score"], record["funding"]) for record in second] == [
+        (record["score"], record["funding"]) for record in first
+    ]
+    assert any(record["score"] or record["funding"] for record in second)
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+import app
+import linkd
+from entity_index import EntityIndex
+from fakes import FakeGeminiClient, LinkdStubServer
+from llm_cache import LLMCache
+from record_io import read_records
+
+
+@pytest.fixture
+def ingestion(monkeypatch, tmp_path):
+    path = str(tmp_path / "founder_data.json")
+    monkeypatch.setattr(app, "gemini_client", FakeGeminiClient())
+    monkeypatch.setattr(app, "llm_cache", LLMCache(":memory:"))
+    monkeypatch.setattr(app, "entity_index", EntityIndex(":memory:"))
+    monkeypatch.setattr(app, "FOUNDER_DATA_PATH", path)
+
+    def run(profiles):
+        with LinkdStubServer(profiles) as stub:
+            monkeypatch.setattr(
+                linkd, "_client", linkd.LinkdClient(url=stub.url, token="test")
+            )
+            asyncio.run(app.get_UCLA_alumnis("Founders"))
+        return list(read_records(path))
+
+    return run
+
+
+def test_rerun_keeps_startups_of_earlier_runs(ingestion):
+    first = ingestion(60)
+    second = ingestion(90)
+
+    assert len(second) > len(first)
+    assert {record["_id"] for record in first} <= {
+        record["_id"] for record in second
+    }
+    assert len({record["_id"] for record in second}) == len(second)
+
+
+def test_failed_enrichment_is_retried_by_the_next_run(ingestion, monkeypatch):
+    async def failing(startup_data, refresh=False):
+        raise RuntimeError("Gemini unavailable")
+
+    fill = app.fill_startup_data
+    monkeypatch.setattr(app, "fill_startup_data", failing)
+    failed = ingestion(30)
+    monkeypatch.setattr(app, "fill_startup_data", fill)
+    retried = ingestion(30)
+
+    # Every startup of the failed run is resolved as new and enriched again
+    assert app.gemini_client.calls["n"] == len(failed) > 0
+    assert len(retried) == len(failed)
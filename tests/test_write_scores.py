@@ -0,0 +1,73 @@
+import pytest
+from bson import ObjectId
+
+import startup_evaluation
+from startup_evaluation import write_scores
+
+
+@pytest.fixture
+def companies():
+    collection = startup_evaluation.companies_collection
+    collection.delete_many({})
+    yield collection
+    collection.delete_many({})
+
+
+def evaluated(company_id, raw_score=50):
+    return {
+        "_id": company_id,
+        "raw_score": raw_score,
+        "score_fingerprint": f"fingerprint-{raw_score}",
+        "funding": 1_000_000,
+        "stage": "Seed",
+    }
+
+
+def test_splits_batches_at_batch_size(companies):
+    ids = [f"company-{index}" for index in range(5)]
+    companies.insert_many([{"_id": company_id} for company_id in ids])
+
+    summary = write_scores([evaluated(company_id) for company_id in ids], batch_size=2)
+
+    assert summary == {"matched": 5, "modified": 5, "batches": 3}
+    assert companies.count_documents({"raw_score": 50, "stage": "Seed"}) == 5
+
+
+def test_summary_counts_matched_and_modified(companies):
+    companies.insert_many([{"_id": "same"}, {"_id": "changed"}])
+    write_scores([evaluated("same"), evaluated("changed")])
+
+    summary = write_scores(
+        [evaluated("same"), evaluated("changed", 80), evaluated("missing")],
+        batch_size=10,
+    )
+
+    assert summary == {"matched": 2, "modified": 1, "batches": 1}
+    assert companies.find_one({"_id": "changed"})["raw_score"] == 80
+
+
+def test_writes_object_id_and_string_ids(companies):
+    object_id = ObjectId()
+    companies.insert_many([{"_id": object_id}, {"_id": "pipeline-record"}])
+
+    summary = write_scores(
+        [evaluated(str(object_id), 60), evaluated("pipeline-record", 70)]
+    )
+
+    assert summary["matched"] == 2
+    assert companies.find_one({"_id": object_id})["raw_score"] == 60
+    assert companies.find_one({"_id": "pipeline-record"})["raw_score"] == 70
+
+
+def test_skips_unevaluated_and_leaves_score_to_normalization(companies):
+    companies.insert_many([{"_id": "a", "score": 10}, {"_id": "b", "score": 20}])
+
+    summary = write_scores([evaluated("a", 90), {"_id": "b", "score": 99}])
+
+    assert summary == {"matched": 1, "modified": 1, "batches": 1}
+    assert companies.find_one({"_id": "a"})["score"] == 10
+    assert companies.find_one({"_id": "b"})["score"] == 20
+
+
+def test_empty_input_sends_no_batches(companies):
+    assert write_scores([]) == {"matched": 0, "modified": 0, "batches": 0}
@@ -0,0 +1,21 @@
+"""
+Standalone job executor for deployments that serve HTTP from asgi_app.py.
+Starts JOB_WORKERS worker threads on the ucla_jobs queue of app.py.
+
+Usage:
+    python worker.py
+"""
+
+import threading
+
+from app import ucla_jobs
+from metrics import get_logger
+
+log = get_logger("worker")
+
+if __name__ == "__main__":
+    ucla_jobs.start()
+    log.info(
+        "workers_started", workers=ucla_jobs.workers, worker_id=ucla_jobs.worker_id
+    )
+    threading.Event().wait()